@@ -1,18 +1,30 @@
 import dash
-from dash import dcc, html, dash_table
-from dash.dependencies import Input, Output, State
+from dash import dcc, html, dash_table, Patch, ctx, no_update
+from dash.dependencies import Input, Output, State, ClientsideFunction
+from dash.dash_table.Format import Format, Scheme, Symbol
 import plotly.express as px
 import plotly.graph_objects as go
+import plotly.colors
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+import json
 import os
+import uuid
+import time
 import warnings
 warnings.filterwarnings("ignore", category=FutureWarning)
 
 
 # Import data generation functions
-from data import generate_protocol_data, generate_pool_data, generate_transaction_data, get_current_metrics
+from data import (
+    generate_protocol_data, generate_pool_data, generate_transaction_data,
+    load_protocol, load_catalog, generate_date_range, http_client
+)
+from dataset import Dataset, DatasetStore, SharedDatasetStore, DataRefresher, LazyProtocolData
+from cache import LRUCache
+from downsample import downsample
+from stream import TransactionRingBuffer, LiveTransactionIndex, StubTransactionSource, TransactionFeed
 
 # Initialize the Dash app
 app = dash.Dash(__name__)
@@ -22,15 +34,167 @@ server = app.server
 if not os.path.exists('assets'):
     os.makedirs('assets')
 
-# Load initial data
-protocol_data = generate_protocol_data()
-pool_data = generate_pool_data()
-transaction_data = generate_transaction_data(n_transactions=100)
-current_metrics = get_current_metrics()
+# Load initial data, timing each step for the startup report
+startup_timings = {}
+
+def timed_load(label, loader, *args, **kwargs):
+    start = time.perf_counter()
+    result = loader(*args, **kwargs)
+    startup_timings[label] = time.perf_counter() - start
+    return result
+
+def print_startup_report():
+    print("Startup data load:")
+    for label, seconds in startup_timings.items():
+        print(f"  {label:<20} {seconds:8.3f}s")
+    print(f"  {'total':<20} {sum(startup_timings.values()):8.3f}s")
+
+# Protocols to cover and the chains each one is on
+catalog = timed_load("catalog", load_catalog)
+
+# Synthetic transactions generated at startup
+TRANSACTION_COUNT = int(os.environ.get("TRANSACTION_COUNT", "100"))
+
+# Seconds between background refreshes of protocol data (0 disables)
+REFRESH_INTERVAL = int(os.environ.get("REFRESH_INTERVAL", "3600"))
+
+# Fetch each protocol the first time it is selected instead of all of them at startup
+LAZY_PROTOCOLS = os.environ.get("LAZY_PROTOCOLS", "0") == "1"
+# Protocols kept loaded in lazy mode; each is reloaded after REFRESH_INTERVAL
+PROTOCOL_CACHE_SIZE = int(os.environ.get("PROTOCOL_CACHE_SIZE", "32"))
+lazy_protocols = None
+if LAZY_PROTOCOLS:
+    lazy_protocols = LazyProtocolData(
+        lambda protocol: load_protocol(protocol, catalog=catalog), PROTOCOL_CACHE_SIZE, ttl=REFRESH_INTERVAL or None
+    )
+
+def print_memory_report(dataset):
+    print("Dataset memory:")
+    for name, usage in dataset.memory_report().items():
+        print(f"  {name:<20} {usage['bytes'] / 1e6:8.1f} MB  ({usage['rows']} rows)")
+
+def load_frames():
+    # In lazy mode the shared frame has no protocols; they load on first selection
+    protocols = [] if LAZY_PROTOCOLS else None
+    return {
+        "protocol_data": timed_load("protocol_data", generate_protocol_data, protocols=protocols, catalog=catalog),
+        "pool_data": timed_load("pool_data", generate_pool_data),
+        "transaction_data": timed_load("transaction_data", generate_transaction_data,
+                                       n_transactions=TRANSACTION_COUNT),
+    }
+
+# With SHARED_DATASET_DIR set (e.g. under gunicorn), one worker builds the data and
+# publishes a memory-mapped snapshot that every worker maps read-only
+SHARED_DATASET_DIR = os.environ.get("SHARED_DATASET_DIR")
+if SHARED_DATASET_DIR:
+    store = SharedDatasetStore(SHARED_DATASET_DIR)
+    if timed_load("map_snapshot", store.load_published) is None:
+        if store.acquire_publisher():
+            # Indexes and rollups are built once, on the mapped frames
+            store.publish(load_frames())
+        else:
+            timed_load("wait_for_publisher", store.wait_for_published)
+else:
+    # Callbacks read the current dataset from the store; the refresher swaps in new days
+    store = DatasetStore(Dataset(**load_frames()))
+
+dataset = store.get()
+protocol_data = dataset.protocol_data
+pool_data = dataset.pool_data
+transaction_data = dataset.transaction_data
+# Derived from the frame above so the fetch pipeline only runs once
+current_metrics = timed_load("current_metrics", dataset.current_metrics)
+print_startup_report()
+print_memory_report(dataset)
+
+# Lazily loaded protocols refresh by expiring instead
+if REFRESH_INTERVAL > 0 and not LAZY_PROTOCOLS:
+    refresher = DataRefresher(store, REFRESH_INTERVAL, catalog=catalog)
+    refresher.start()
 
-# Get unique values for filters
-protocols = sorted(protocol_data['protocol'].unique())
-chains = sorted(protocol_data['chain'].unique())
+# Seconds between polls of the live transaction feed (0 keeps the static table)
+TRANSACTION_FEED_INTERVAL = float(os.environ.get("TRANSACTION_FEED_INTERVAL", "0"))
+# Most recent transactions kept in memory by the feed, per process
+TRANSACTION_BUFFER_SIZE = int(os.environ.get("TRANSACTION_BUFFER_SIZE", "10000"))
+# Rows per page of the transaction table
+TRANSACTION_PAGE_SIZE = 10
+# Send raw USD amounts and let the table's column format render them in the browser
+TRANSACTION_CLIENT_FORMAT = os.environ.get("TRANSACTION_CLIENT_FORMAT", "0") == "1"
+USD_FORMAT = Format(precision=2, scheme=Scheme.fixed, symbol=Symbol.yes, symbol_prefix="$")
+
+transaction_buffer = None
+if TRANSACTION_FEED_INTERVAL > 0:
+    transaction_buffer = TransactionRingBuffer(TRANSACTION_BUFFER_SIZE, transaction_data)
+    transaction_buffer.append(transaction_data.sort_values("timestamp"))
+    transaction_feed = TransactionFeed(StubTransactionSource(), transaction_buffer, TRANSACTION_FEED_INTERVAL)
+    transaction_feed.start()
+
+# Ship the selected protocol's daily per-chain series to the browser once and recompute
+# the pie, bar chart and metric cards there when metrics, chains or dates change
+CLIENT_CHARTS = os.environ.get("CLIENT_CHARTS", "0") == "1"
+
+# Figures for recently used filter combinations, dropped whenever the dataset version changes
+FIGURE_CACHE_SIZE = int(os.environ.get("FIGURE_CACHE_SIZE", "128"))
+figure_cache = LRUCache(maxsize=FIGURE_CACHE_SIZE)
+# Figure keys start with a token of the process that cached the figure: dataset and
+# protocol versions are counted per process, so another gunicorn worker may use the
+# same key for a different figure. Made per pid, as forked workers inherit globals.
+figure_key_token = (None, None)
+
+def process_token():
+    global figure_key_token
+    pid, token = figure_key_token
+    if pid != os.getpid():
+        pid, token = figure_key_token = (os.getpid(), uuid.uuid4().hex)
+    return token
+
+# Metric card values per filter combination, dropped with the figures
+card_cache = LRUCache(maxsize=FIGURE_CACHE_SIZE)
+
+# Points plotted per time series trace: about one per pixel of the graph's width, capped.
+# Longer series are downsampled, and zooming in re-fetches the visible range in full.
+TIME_SERIES_MAX_POINTS = int(os.environ.get("TIME_SERIES_MAX_POINTS", "2000"))
+# Downsampling method: "lttb" (Largest-Triangle-Three-Buckets) or "minmax" (per-bucket extremes)
+DOWNSAMPLE_METHOD = os.environ.get("DOWNSAMPLE_METHOD", "lttb")
+# Graph width assumed until the browser reports it
+DEFAULT_GRAPH_WIDTH = 1000
+# Automatic granularity: the finest of daily, weekly and monthly rows with at most this many
+# periods in the selected range
+GRANULARITY_MAX_PERIODS = int(os.environ.get("GRANULARITY_MAX_PERIODS", "200"))
+
+@server.route("/_stats/figure-cache")
+def figure_cache_stats():
+    return figure_cache.stats()
+
+@server.route("/_stats/http")
+def http_stats():
+    return http_client.stats()
+
+@server.route("/_stats/memory")
+def memory_stats():
+    report = store.get().memory_report()
+    if lazy_protocols is not None:
+        report["protocol_data"] = lazy_protocols.memory_report()
+    return report
+
+@server.route("/_stats/protocols")
+def protocol_stats():
+    return lazy_protocols.stats() if lazy_protocols is not None else {}
+
+# Protocol index, rollup, time pyramid and data version the callbacks read for one protocol
+def protocol_view(dataset, protocol):
+    if lazy_protocols is None or protocol not in catalog.slugs:
+        return dataset.protocol_index, dataset.protocol_rollup, dataset.protocol_pyramid, 0
+    entry = lazy_protocols.get(protocol)
+    return entry.index, entry.rollup, entry.pyramid, entry.version
+
+# Filter options come from the catalog, so they are known before any protocol is loaded
+protocols = sorted(catalog.slugs)
+chains = catalog.all_chains
+if LAZY_PROTOCOLS:
+    first_date, last_date = generate_date_range()[[0, -1]]
+else:
+    first_date, last_date = protocol_data['date'].min(), protocol_data['date'].max()
 metrics = ['tvl', 'fees', 'revenue', 'expenses', 'volume']
 versions = sorted(pool_data['version'].unique())
 
@@ -45,6 +209,22 @@ def format_currency(value):
     else:
         return f"${value:.2f}"
 
+# Frame of (chain, total) pairs for the pie and bar charts
+def chain_totals(totals, metric):
+    return pd.DataFrame({
+        "chain": pd.Series([chain for chain, _ in totals], dtype=object),
+        metric: np.array([total for _, total in totals], dtype=float),
+    })
+
+# Styling the clientside charts share with the server-built figures
+def chart_config():
+    template = json.loads(go.Figure(layout={"template": "plotly_white"}).to_json())["layout"]["template"]
+    return {
+        "template": template,
+        "piecolorway": px.colors.qualitative.Set2,
+        "colorscale": plotly.colors.make_colorscale(px.colors.sequential.Blues),
+    }
+
 # Define the app layout
 app.layout = html.Div(
     className="container",
@@ -97,8 +277,8 @@ app.layout = html.Div(
                         html.H2("Time Range"),
                         dcc.DatePickerRange(
                             id="date-picker",
-                            start_date=protocol_data['date'].min(),
-                            end_date=protocol_data['date'].max(),
+                            start_date=first_date,
+                            end_date=last_date,
                             display_format="MMM DD, YYYY"
                         )
                     ]
@@ -124,6 +304,25 @@ app.layout = html.Div(
                     ]
                 ),
                 
+                # Time Series Granularity
+                html.Div(
+                    className="sidebar-section",
+                    children=[
+                        html.H2("Granularity"),
+                        dcc.Dropdown(
+                            id="granularity-radio",
+                            options=[
+                                {"label": "Auto", "value": "auto"},
+                                {"label": "Daily", "value": "daily"},
+                                {"label": "Weekly", "value": "weekly"},
+                                {"label": "Monthly", "value": "monthly"}
+                            ],
+                            value="auto",
+                            clearable=False
+                        )
+                    ]
+                ),
+                
                 # Protocol Version
                 html.Div(
                     className="sidebar-section",
@@ -276,7 +475,18 @@ app.layout = html.Div(
                                 html.Div(className="graph-title", children="Chain Comparison"),
                                 dcc.Graph(id="protocol-comparison-graph", style={"height": "250px"})
                             ]
-                        )
+                        ),
+
+                        # Cache keys of the figures the graphs show, so Apply can send only the changes
+                        dcc.Store(id="figure-keys"),
+
+                        # Pixel width of the time series graph, which sets how many points it plots
+                        dcc.Store(id="time-series-width"),
+
+                        # Client-side charts: the shipped series, its version and the figure styling
+                        dcc.Store(id="protocol-series"),
+                        dcc.Store(id="protocol-series-key"),
+                        dcc.Store(id="chart-config", data=chart_config() if CLIENT_CHARTS else None)
                     ]
                 ),
                 
@@ -289,15 +499,26 @@ app.layout = html.Div(
                         dash_table.DataTable(
                             id="transaction-table",
                             columns=[
-                                {"name": "Time", "id": "timestamp"},
+                                {"name": "Time", "id": "timestamp", "type": "datetime"},
                                 {"name": "Protocol", "id": "protocol"},
                                 {"name": "Chain", "id": "chain"},
                                 {"name": "Wallet", "id": "wallet_address"},
                                 {"name": "Action", "id": "action"},
-                                {"name": "Amount (USD)", "id": "amount_usd"},
-                                {"name": "Gas Fee (USD)", "id": "gas_fee_usd"}
+                                {"name": "Amount (USD)", "id": "amount_usd", "type": "numeric",
+                                 **({"format": USD_FORMAT} if TRANSACTION_CLIENT_FORMAT else {})},
+                                {"name": "Gas Fee (USD)", "id": "gas_fee_usd", "type": "numeric",
+                                 **({"format": USD_FORMAT} if TRANSACTION_CLIENT_FORMAT else {})}
                             ],
-                            data=transaction_data.sort_values("timestamp", ascending=False).head(10).to_dict("records"),
+                            data=[],
+                            # Paging, sorting and filtering run on the server; only the visible page is sent
+                            page_action="custom",
+                            page_current=0,
+                            page_size=TRANSACTION_PAGE_SIZE,
+                            sort_action="custom",
+                            sort_mode="single",
+                            sort_by=[],
+                            filter_action="custom",
+                            filter_query="",
                             style_cell={
                                 'textAlign': 'left',
                                 'padding': '5px 10px',
@@ -320,9 +541,23 @@ app.layout = html.Div(
                                     'backgroundColor': '#f8f9fa'
                                 }
                             ],
-                            page_size=5,
                             style_as_list_view=True,
                             style_table={'overflowX': 'auto', 'maxHeight': '250px'}
+                        ),
+                        # Live feed: the interval pulls rows appended after the cursor
+                        dcc.Interval(
+                            id="transaction-interval",
+                            interval=max(TRANSACTION_FEED_INTERVAL, 1) * 1000,
+                            disabled=transaction_buffer is None
+                        ),
+                        dcc.Store(
+                            id="transaction-cursor",
+                            data={
+                                "position": transaction_buffer.total if transaction_buffer else 0,
+                                "rows": 0,
+                                "protocol": None,
+                                "chains": None
+                            }
                         )
                     ]
                 )
@@ -331,32 +566,18 @@ app.layout = html.Div(
     ]
 )
 
-# Callback for updating time series graph
-@app.callback(
-    Output("time-series-graph", "figure"),
-    [Input("apply-button", "n_clicks")],
-    [
-        State("protocol-dropdown", "value"),
-        State("chain-dropdown", "value"),
-        State("date-picker", "start_date"),
-        State("date-picker", "end_date"),
-        State("metric-checklist", "value"),
-        State("data-type-radio", "value")
-    ]
-)
-def update_time_series(n_clicks, protocol, chains, start_date, end_date, metrics, data_type):
-    # Choose dataset based on data type
+# Build the time series figure from the filtered rows at ``level`` granularity, each trace
+# downsampled to at most ``points`` points; ``x_range`` keeps a zoomed-in view's x-axis range
+def time_series_figure(df, metrics, data_type, points=None, x_range=None, level="daily"):
     if data_type == "protocol":
-        df = protocol_data.copy()
         title = "Protocol Metrics Over Time"
     else:
-        df = pool_data.copy()
         title = "Pool Metrics Over Time"
-    
-    # Apply filters
-    df = df[df["protocol"] == protocol]
-    df = df[df["chain"].isin(chains)]
-    df = df[(df["date"] >= start_date) & (df["date"] <= end_date)]
+    if level != "daily":
+        title = f"{title} ({level.capitalize()})"
+
+    # Pool data has no revenue/expenses columns
+    metrics = [metric for metric in metrics if metric in df.columns]
     
     # Group by date and aggregate selected metrics
     grouped_df = df.groupby("date")[metrics].sum().reset_index()
@@ -374,10 +595,15 @@ def update_time_series(n_clicks, protocol, chains, start_date, end_date, metrics
     }
     
     for metric in metrics:
+        rows = grouped_df
+        if points:
+            rows = grouped_df.iloc[downsample(
+                grouped_df["date"].to_numpy().view("i8"), grouped_df[metric].to_numpy(), points, DOWNSAMPLE_METHOD
+            )]
         fig.add_trace(
             go.Scatter(
-                x=grouped_df["date"],
-                y=grouped_df[metric],
+                x=rows["date"],
+                y=rows[metric],
                 mode="lines",
                 name=metric.capitalize(),
                 line=dict(color=colors.get(metric, '#0066cc'), width=2)
@@ -402,40 +628,13 @@ def update_time_series(n_clicks, protocol, chains, start_date, end_date, metrics
     
     # Format y-axis to be more readable
     fig.update_yaxes(tickformat="$.2s")
+    if x_range is not None:
+        fig.update_xaxes(range=x_range)
     
     return fig
 
-# Callback for updating chain distribution graph
-@app.callback(
-    Output("chain-distribution-graph", "figure"),
-    [Input("apply-button", "n_clicks")],
-    [
-        State("protocol-dropdown", "value"),
-        State("chain-dropdown", "value"),
-        State("date-picker", "start_date"),
-        State("date-picker", "end_date"),
-        State("metric-checklist", "value"),
-        State("data-type-radio", "value")
-    ]
-)
-def update_chain_distribution(n_clicks, protocol, chains, start_date, end_date, metrics, data_type):
-    # Choose dataset based on data type
-    if data_type == "protocol":
-        df = protocol_data.copy()
-    else:
-        df = pool_data.copy()
-    
-    # Apply filters
-    df = df[df["protocol"] == protocol]
-    df = df[df["chain"].isin(chains)]
-    df = df[(df["date"] >= start_date) & (df["date"] <= end_date)]
-    
-    # Use the first metric in the list by default
-    selected_metric = metrics[0] if metrics else "tvl"
-    
-    # Group by chain and aggregate selected metric
-    chain_data = df.groupby("chain")[selected_metric].sum().reset_index()
-    
+# Build the chain distribution pie from per-chain totals
+def chain_distribution_figure(chain_data, selected_metric):
     # Create figure
     fig = px.pie(
         chain_data,
@@ -469,41 +668,8 @@ def update_chain_distribution(n_clicks, protocol, chains, start_date, end_date,
     
     return fig
 
-# Callback for updating protocol comparison graph
-@app.callback(
-    Output("protocol-comparison-graph", "figure"),
-    [Input("apply-button", "n_clicks")],
-    [
-        State("protocol-dropdown", "value"),
-        State("chain-dropdown", "value"),
-        State("date-picker", "start_date"),
-        State("date-picker", "end_date"),
-        State("metric-checklist", "value"),
-        State("data-type-radio", "value"),
-        State("version-radio", "value")
-    ]
-)
-def update_protocol_comparison(n_clicks, protocol, chains, start_date, end_date, metrics, data_type, version):
-    # Choose dataset based on data type
-    if data_type == "protocol":
-        df = protocol_data.copy()
-    else:
-        df = pool_data.copy()
-        if version != "all":
-            df = df[df["version"] == version]
-    
-    # Apply filters - only filter by the selected protocol
-    df = df[df["protocol"] == protocol]
-    df = df[df["chain"].isin(chains)]
-    df = df[(df["date"] >= start_date) & (df["date"] <= end_date)]
-    
-    # Use the first metric in the list by default
-    selected_metric = metrics[0] if metrics else "tvl"
-    
-    # For protocol comparison with single protocol selection, show comparison by chains
-    # Group by chain and aggregate selected metric
-    comparison_data = df.groupby("chain")[selected_metric].sum().reset_index()
-    
+# Build the chain comparison bar chart from per-chain totals
+def protocol_comparison_figure(comparison_data, selected_metric):
     # Sort data by value for better visualization
     comparison_data = comparison_data.sort_values(selected_metric, ascending=False)
     
@@ -549,36 +715,524 @@ def update_protocol_comparison(n_clicks, protocol, chains, start_date, end_date,
     
     return fig
 
-# Callback for updating transaction table
+# Compute the metric card values from the latest rows at or before end_date
+def metric_card_values(dataset, protocol, chains, end_date):
+    if card_cache.generation != dataset.version:
+        card_cache.clear(dataset.version)
+    index, _, _, protocol_version = protocol_view(dataset, protocol)
+    key = (protocol_version, protocol, tuple(chains or ()), end_date)
+    values = card_cache.get(key)
+    if values is not None:
+        return values
+
+    # One binary search per chain finds its latest row; the cards sum the chains at the latest date
+    _, totals, active = index.latest([(protocol, chain) for chain in chains or []],
+                                     ["tvl", "fees", "revenue", "volume"], end_date)
+    values = [
+        format_currency(totals["tvl"]),
+        format_currency(totals["fees"]),
+        format_currency(totals["revenue"]),
+        format_currency(totals["volume"]),
+        str(len(active)),
+        "1"  # Only one protocol is selected
+    ]
+    card_cache.put(key, values)
+    return values
+
+# One callback for everything "Apply Filters" updates: a single request per click,
+# one dataset snapshot, and the filtered rows computed once and shared
 @app.callback(
-    Output("transaction-table", "data"),
+    [
+        Output("time-series-graph", "figure"),
+        Output("chain-distribution-graph", "figure"),
+        Output("protocol-comparison-graph", "figure"),
+        Output("tvl-value", "children"),
+        Output("fees-value", "children"),
+        Output("revenue-value", "children"),
+        Output("volume-value", "children"),
+        Output("chains-value", "children"),
+        Output("protocols-value", "children"),
+        Output("figure-keys", "data")
+    ],
     [Input("apply-button", "n_clicks")],
     [
         State("protocol-dropdown", "value"),
         State("chain-dropdown", "value"),
-        State("data-type-radio", "value")
+        State("date-picker", "start_date"),
+        State("date-picker", "end_date"),
+        State("metric-checklist", "value"),
+        State("data-type-radio", "value"),
+        State("version-radio", "value"),
+        State("granularity-radio", "value"),
+        State("figure-keys", "data"),
+        State("time-series-width", "data")
     ]
 )
-def update_transaction_table(n_clicks, protocol, chains, data_type):
-    if data_type != "transaction":
-        return []
-    
-    # Filter transactions
-    df = transaction_data.copy()
-    df = df[df["protocol"] == protocol]
-    df = df[df["chain"].isin(chains)]
+def update_dashboard(n_clicks, protocol, chains, start_date, end_date, metrics, data_type, version, granularity,
+                     shown_keys, width):
+    dataset = store.get()
+
+    # Revisited filter combinations reuse the serialized figures
+    if figure_cache.generation != dataset.version:
+        figure_cache.clear(dataset.version)
+    points = time_series_points(width)
+    key = (process_token(), dataset.version, protocol_view(dataset, protocol)[3], protocol, tuple(chains or ()),
+           start_date, end_date, tuple(metrics or ()), data_type, version, granularity, points)
+    figures = figure_cache.get(key)
+    if figures is None:
+        figures = build_figures(dataset, protocol, chains, start_date, end_date, metrics, data_type, version,
+                                granularity, points)
+        figure_cache.put(key, figures)
+
+    # Figures the browser already shows, if still cached, only receive the differences
+    shown_keys = shown_keys or [None] * len(figures)
+    updates = []
+    for position, figure in enumerate(figures):
+        shown = cached_figure(shown_keys[position], position)
+        updates.append(figure if shown is None else figure_patch(shown, figure))
+    keys = [list_key(key)] * len(figures)
+
+    if CLIENT_CHARTS and data_type == "protocol":
+        # The browser recomputes the pie, bar chart and cards from the shipped series,
+        # so they no longer match any server-side figure
+        return [updates[0], *[no_update] * 8, [keys[0], None, None]]
+    return [*updates, *metric_card_values(dataset, protocol, chains, end_date), keys]
+
+# Points per time series trace for a graph ``width`` pixels wide, rounded up to 100s
+# so that similar widths share cached figures
+def time_series_points(width):
+    width = width or DEFAULT_GRAPH_WIDTH
+    return min(-(-width // 100) * 100, TIME_SERIES_MAX_POINTS)
+
+# Figure cache keys travel through the figure-keys store as nested lists
+def list_key(key):
+    return [list(part) if isinstance(part, tuple) else part for part in key]
+
+def tuple_key(key):
+    return tuple(tuple(part) if isinstance(part, list) else part for part in key)
+
+def cached_figure(shown_key, position):
+    if shown_key is None:
+        return None
+    # Only read to diff against, so neither a hit nor a miss
+    figures = figure_cache.peek(tuple_key(shown_key))
+    return figures[position] if figures is not None else None
+
+# Patch turning the figure the browser shows into ``new``: changed keys are assigned,
+# grown arrays (e.g. a later end date) only send the appended points
+def figure_patch(shown, new):
+    patch = Patch()
+    patch_changes(shown, new, patch)
+    if not patch.to_plotly_json()["operations"]:
+        return no_update
+    # Autorange like a freshly sent figure instead of keeping a stale zoom
+    for axis in ("xaxis", "yaxis"):
+        if axis in new.get("layout", {}):
+            patch["layout"][axis]["autorange"] = True
+    return patch
+
+def patch_changes(old, new, location):
+    for key, value in new.items():
+        if key not in old:
+            location[key] = value
+        elif old[key] != value:
+            patch_value(old[key], value, location, key)
+    for key in old:
+        if key not in new:
+            del location[key]
+
+def patch_value(old, new, location, key):
+    if isinstance(old, dict) and isinstance(new, dict):
+        patch_changes(old, new, location[key])
+    elif not (isinstance(old, list) and isinstance(new, list)):
+        location[key] = new
+    elif len(new) > len(old) and new[:len(old)] == old:
+        location[key].extend(new[len(old):])
+    elif old and new and all(isinstance(item, dict) for item in old + new):
+        # Traces or annotations: patch the shared ones in place, then add or drop the rest
+        for i in range(min(len(old), len(new))):
+            if old[i] != new[i]:
+                patch_value(old[i], new[i], location[key], i)
+        if len(new) > len(old):
+            location[key].extend(new[len(old):])
+        for i in reversed(range(len(new), len(old))):
+            del location[key][i]
+    else:
+        location[key] = new
+
+# Build the three figures for a filter combination as JSON-ready dicts
+def build_figures(dataset, protocol, chains, start_date, end_date, metrics, data_type, version,
+                  granularity="auto", points=None):
+    # Apply filters by slicing the pre-sorted index, rollup and time pyramid
+    if data_type == "protocol":
+        index, rollup, pyramid, _ = protocol_view(dataset, protocol)
+    else:
+        index, rollup = dataset.index_for(data_type), dataset.rollup_for(data_type)
+        pyramid = dataset.pyramid_for(data_type)
+
+    # Use the first selected metric this data type has (pool data has no revenue
+    # or expenses), or TVL
+    selected_metric = next((metric for metric in metrics or [] if metric in rollup.metrics), "tvl")
+    has_metric = selected_metric in rollup.metrics
+
+    # Per-chain totals are prefix-sum differences on the pre-aggregated rollup
+    chain_data = chain_totals(
+        rollup.totals_by_chain(protocol, chains, selected_metric, start_date, end_date) if has_metric else [],
+        selected_metric
+    )
     
+    # For protocol comparison with single protocol selection, show comparison by chains
+    if data_type != "protocol" and version != "all" and has_metric:
+        # The rollup is not split by version, so sum the filtered slices instead
+        slices = index.slices(protocol, chains, start_date, end_date)
+        # Chains without rows of this version are left out, as a groupby would
+        version_views = ((chain, view[view["version"] == version]) for chain, view in slices)
+        totals = sorted((chain, view[selected_metric].sum()) for chain, view in version_views if not view.empty)
+        comparison_data = chain_totals(totals, selected_metric)
+    else:
+        comparison_data = chain_data
+
+    # Long ranges plot weekly or monthly rows instead of every day
+    level = time_series_level(pyramid, granularity, start_date, end_date)
+    time_series = pyramid.filter(level, protocol, chains, start_date, end_date)
+
+    figures = (
+        time_series_figure(time_series, metrics, data_type, points, level=level),
+        chain_distribution_figure(chain_data, selected_metric),
+        protocol_comparison_figure(comparison_data, selected_metric)
+    )
+    # Plain JSON types are cheap to cache and re-send
+    return [json.loads(fig.to_json()) for fig in figures]
+
+# The pyramid level to plot: the chosen granularity, or with "auto" the finest one with
+# at most GRANULARITY_MAX_PERIODS periods between the two dates
+def time_series_level(pyramid, granularity, start_date, end_date):
+    if granularity in ("daily", "weekly", "monthly"):
+        return granularity
+    return pyramid.level_for(start_date, end_date, GRANULARITY_MAX_PERIODS)
+
+# Length of an Apply figure key; a zoomed time series key adds the x-axis range
+FIGURE_KEY_LENGTH = 12
+
+# The x-axis range of a zoom, "reset" for a double-click back to the whole range, or None
+def relayout_x_range(relayout):
+    relayout = relayout or {}
+    if relayout.get("xaxis.autorange"):
+        return "reset"
+    if "xaxis.range" in relayout:
+        return list(relayout["xaxis.range"])
+    if "xaxis.range[0]" in relayout and "xaxis.range[1]" in relayout:
+        return [relayout["xaxis.range[0]"], relayout["xaxis.range[1]"]]
+    return None
+
+# Time series of an applied filter key restricted to ``x_range``, at full resolution
+# up to the key's point budget
+def zoomed_time_series(dataset, key, x_range):
+    _, _, _, protocol, chains, start_date, end_date, metrics, data_type, _, granularity, points = key
+    if data_type == "protocol":
+        pyramid = protocol_view(dataset, protocol)[2]
+    else:
+        pyramid = dataset.pyramid_for(data_type)
+    # One day either side, so the lines run to the edges of the view
+    start = pd.Timestamp(x_range[0]).floor("D") - pd.Timedelta(days=1)
+    end = pd.Timestamp(x_range[1]).ceil("D") + pd.Timedelta(days=1)
+    if start_date is not None:
+        start = max(start, pd.Timestamp(start_date))
+    if end_date is not None:
+        end = min(end, pd.Timestamp(end_date))
+    # With "auto", the zoomed range picks its own (finer) level
+    level = time_series_level(pyramid, granularity, start, end)
+    df = pyramid.filter(level, protocol, list(chains), start, end)
+    figure = time_series_figure(df, list(metrics), data_type, points, x_range, level)
+    return json.loads(figure.to_json())
+
+# Zooming the time series swaps in the visible range at full resolution; resetting the
+# axes swaps the downsampled whole range back in
+@app.callback(
+    [
+        Output("time-series-graph", "figure", allow_duplicate=True),
+        Output("figure-keys", "data", allow_duplicate=True)
+    ],
+    [Input("time-series-graph", "relayoutData")],
+    [State("figure-keys", "data")],
+    prevent_initial_call=True
+)
+def zoom_time_series(relayout, shown_keys):
+    x_range = relayout_x_range(relayout)
+    if x_range is None or not shown_keys or shown_keys[0] is None:
+        return no_update, no_update
+    shown_key = shown_keys[0]
+    base_key = tuple_key(shown_key[:FIGURE_KEY_LENGTH])
+    # Figures of an older dataset version or of another process are not cached here;
+    # the next Apply redraws everything
+    dataset = store.get()
+    base = figure_cache.peek(base_key)
+    if base is None or base_key[1] != dataset.version:
+        return no_update, no_update
+
+    if x_range == "reset":
+        key, figure = base_key, base[0]
+    else:
+        key = (*base_key, tuple(x_range))
+        figures = figure_cache.get(key)
+        if figures is None:
+            figures = [zoomed_time_series(dataset, base_key, x_range), None, None]
+            figure_cache.put(key, figures)
+        figure = figures[0]
+
+    shown = cached_figure(shown_key, 0)
+    if shown is None:
+        update = figure
+    else:
+        update = Patch()
+        patch_changes(shown, figure, update)
+        if not update.to_plotly_json()["operations"]:
+            return no_update, no_update
+    return update, [list_key(key), *shown_keys[1:]]
+
+# Report the time series graph's width whenever Plotly lays it out (first render, resize)
+app.clientside_callback(
+    """
+    function (relayoutData) {
+        var graph = document.getElementById("time-series-graph");
+        return graph && graph.offsetWidth ? graph.offsetWidth : window.dash_clientside.no_update;
+    }
+    """,
+    Output("time-series-width", "data"),
+    [Input("time-series-graph", "relayoutData")]
+)
+
+# Daily per-chain series of one protocol, the payload the clientside charts compute from
+def protocol_series(dataset, protocol):
+    slices = protocol_view(dataset, protocol)[0].slices(protocol, chains)
+    if not slices:
+        return {"protocol": protocol, "dates": [], "chains": {}}
+    dates = np.unique(np.concatenate([view["date"].to_numpy() for _, view in slices]))
+    series = {}
+    for chain, view in slices:
+        # Positions into ``dates``, then each metric with NaN as null
+        series[chain] = {"rows": np.searchsorted(dates, view["date"].to_numpy()).tolist()}
+        for metric in metrics:
+            series[chain][metric] = [None if value != value else value for value in view[metric].astype(float).tolist()]
+    return {
+        "protocol": protocol,
+        "dates": np.datetime_as_string(dates, unit="D").tolist(),
+        "chains": series,
+    }
+
+if CLIENT_CHARTS:
+    # Ships the series on Apply only when the protocol or its data version changed
+    @app.callback(
+        [Output("protocol-series", "data"), Output("protocol-series-key", "data")],
+        [Input("apply-button", "n_clicks")],
+        [
+            State("protocol-dropdown", "value"),
+            State("data-type-radio", "value"),
+            State("protocol-series-key", "data")
+        ]
+    )
+    def ship_protocol_series(n_clicks, protocol, data_type, shipped_key):
+        if data_type != "protocol":
+            return no_update, no_update
+        dataset = store.get()
+        key = [protocol, dataset.version, protocol_view(dataset, protocol)[3]]
+        if key == shipped_key:
+            return no_update, no_update
+        return protocol_series(dataset, protocol), key
+
+    # assets/charts.js; the time series still comes from update_dashboard on Apply
+    app.clientside_callback(
+        ClientsideFunction(namespace="charts", function_name="update"),
+        [
+            Output("chain-distribution-graph", "figure", allow_duplicate=True),
+            Output("protocol-comparison-graph", "figure", allow_duplicate=True),
+            Output("tvl-value", "children", allow_duplicate=True),
+            Output("fees-value", "children", allow_duplicate=True),
+            Output("revenue-value", "children", allow_duplicate=True),
+            Output("volume-value", "children", allow_duplicate=True),
+            Output("chains-value", "children", allow_duplicate=True),
+            Output("protocols-value", "children", allow_duplicate=True)
+        ],
+        [
+            Input("protocol-series", "data"),
+            Input("apply-button", "n_clicks"),
+            Input("metric-checklist", "value"),
+            Input("chain-dropdown", "value"),
+            Input("date-picker", "start_date"),
+            Input("date-picker", "end_date")
+        ],
+        [
+            State("chart-config", "data"),
+            State("protocol-dropdown", "value"),
+            State("data-type-radio", "value")
+        ],
+        prevent_initial_call=True
+    )
+
+# Index the table reads: over the live buffer when streaming, else the static frame.
+# The live index only indexes the rows appended since the table last read it.
+live_transaction_index = LiveTransactionIndex(transaction_buffer) if transaction_buffer else None
+
+def current_transaction_index():
+    if live_transaction_index is None:
+        return store.get().transaction_index
+    return live_transaction_index
+
+def filter_transactions(df, protocol, chains):
+    if protocol is not None:
+        df = df[df["protocol"] == protocol]
+    if chains is not None:
+        df = df[df["chain"].isin(chains)]
+    return df
+
+# Powers of ten from 10 up, to count the digits of whole dollar amounts
+DIGIT_THRESHOLDS = 10 ** np.arange(1, 19, dtype=np.int64)
+
+# "$1234.50"-style strings for a whole array of USD amounts, like "${:.2f}".format,
+# written digit by digit into one character matrix (as random_hex_strings does)
+def format_usd(values):
+    values = np.asarray(values, dtype=float)
+    scaled = np.abs(values) * 100
+    # NaN, infinities, huge amounts and amounts within rounding error of half a
+    # cent are rare; Python's format decides those
+    exact = ~(scaled < 1e15)
+    scaled[exact] = 0.0
+    exact |= np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    cents = np.rint(scaled).astype(np.int64)
+    dollars = cents // 100
+    n_digits = 1 + np.searchsorted(DIGIT_THRESHOLDS, dollars, side="right")
+    width = int(n_digits.max(initial=1))
+
+    # "$" or "$-", the dollar digits without leading zeros, "." and two cent digits
+    negative = np.signbit(values)
+    start = 1 + negative
+    chars = np.zeros((len(values), width + 5), dtype=np.uint8)
+    chars[:, 0] = ord("$")
+    chars[negative, 1] = ord("-")
+    digits = dollars[:, None] // 10 ** np.arange(width - 1, -1, -1, dtype=np.int64) % 10
+    leading = width - n_digits
+    rows, columns = np.nonzero(np.arange(width) >= leading[:, None])
+    chars[rows, start[rows] + columns - leading[rows]] = ord("0") + digits[rows, columns]
+    point = start + n_digits
+    positions = np.arange(len(values))
+    chars[positions, point] = ord(".")
+    chars[positions, point + 1] = ord("0") + cents % 100 // 10
+    chars[positions, point + 2] = ord("0") + cents % 10
+
+    # Trailing zero bytes are dropped by the fixed-width bytes view
+    text = chars.view(f"S{chars.shape[1]}").ravel().astype(str).astype(object)
+    text[exact] = ["${:.2f}".format(value) for value in values[exact]]
+    return text
+
+# Format transaction rows for display with whole-column string operations.
+# Callers pass only the rows being shown (a page, or the newest streamed rows),
+# so the cost follows the page size rather than the number of transactions.
+def format_transactions(df, client_format=False):
+    df = df.copy()
+
     # Format timestamp
-    df["timestamp"] = df["timestamp"].dt.strftime("%Y-%m-%d %H:%M:%S")
+    seconds = df["timestamp"].to_numpy().astype("datetime64[s]")
+    df["timestamp"] = np.char.replace(np.datetime_as_string(seconds), "T", " ")
     
-    # Format amount and gas fee
-    df["amount_usd"] = df["amount_usd"].apply(lambda x: f"${x:.2f}")
-    df["gas_fee_usd"] = df["gas_fee_usd"].apply(lambda x: f"${x:.2f}")
+    # Format amount and gas fee, unless the table's column format does it in the browser
+    if not client_format:
+        df["amount_usd"] = format_usd(df["amount_usd"])
+        df["gas_fee_usd"] = format_usd(df["gas_fee_usd"])
     
     # Shorten wallet address for display
-    df["wallet_address"] = df["wallet_address"].apply(lambda x: x[:6] + "..." + x[-4:])
-    
-    return df.sort_values("timestamp", ascending=False).head(10).to_dict("records")
+    df["wallet_address"] = df["wallet_address"].str.slice_replace(6, -4, "...")
+    return df
+
+# Callback serving one page of the transaction table
+@app.callback(
+    [
+        Output("transaction-table", "data"),
+        Output("transaction-table", "page_count"),
+        Output("transaction-table", "page_current"),
+        Output("transaction-cursor", "data")
+    ],
+    [
+        Input("apply-button", "n_clicks"),
+        Input("transaction-table", "page_current"),
+        Input("transaction-table", "page_size"),
+        Input("transaction-table", "sort_by"),
+        Input("transaction-table", "filter_query")
+    ],
+    [
+        State("protocol-dropdown", "value"),
+        State("chain-dropdown", "value"),
+        State("data-type-radio", "value"),
+        State("transaction-cursor", "data")
+    ]
+)
+def update_transaction_table(n_clicks, page_current, page_size, sort_by, filter_query,
+                             protocol, chains, data_type, cursor):
+    # Paging keeps the filters of the last Apply; Apply starts again from the first page
+    if ctx.triggered_id in (None, "apply-button"):
+        page_current = 0
+    else:
+        protocol, chains = cursor["protocol"], cursor["chains"]
+
+    # The live feed resumes from here
+    cursor = {
+        "position": transaction_buffer.total if transaction_buffer else 0,
+        "rows": 0,
+        "protocol": protocol,
+        "chains": chains
+    }
+    if data_type != "transaction":
+        return [], 1, page_current, cursor
+
+    page, total = current_transaction_index().page(
+        protocol, chains or [], sort_by, filter_query, page_current or 0, page_size
+    )
+    rows = format_transactions(page, TRANSACTION_CLIENT_FORMAT).to_dict("records")
+    cursor["rows"] = len(rows)
+    return rows, max(-(-total // page_size), 1), page_current, cursor
+
+# Callback pushing newly streamed transactions to the table as a partial update
+@app.callback(
+    [
+        Output("transaction-table", "data", allow_duplicate=True),
+        Output("transaction-cursor", "data", allow_duplicate=True)
+    ],
+    [Input("transaction-interval", "n_intervals")],
+    [
+        State("transaction-cursor", "data"),
+        State("data-type-radio", "value"),
+        State("transaction-table", "page_current"),
+        State("transaction-table", "page_size"),
+        State("transaction-table", "sort_by"),
+        State("transaction-table", "filter_query")
+    ],
+    prevent_initial_call=True
+)
+def stream_transactions(n_intervals, cursor, data_type, page_current, page_size, sort_by, filter_query):
+    if transaction_buffer is None or data_type != "transaction":
+        return no_update, no_update
+    # Only the default view (first page, newest first, unfiltered) follows the feed
+    newest_first = not sort_by or sort_by == [{"column_id": "timestamp", "direction": "desc"}]
+    if page_current or not newest_first or filter_query:
+        return no_update, no_update
+
+    new_rows, position = transaction_buffer.since(cursor["position"])
+    new_rows = filter_transactions(new_rows, cursor["protocol"], cursor["chains"] or [])
+    if position == cursor["position"]:
+        return no_update, no_update
+    cursor = {**cursor, "position": position}
+    if new_rows.empty:
+        return no_update, cursor
+
+    # Only the new rows travel to the browser: newest on top, oldest dropped off the end
+    new_rows = new_rows.tail(page_size)
+    patch = Patch()
+    for row in format_transactions(new_rows, TRANSACTION_CLIENT_FORMAT).to_dict("records"):
+        patch.prepend(row)
+    shown = cursor["rows"] + len(new_rows)
+    for index in range(shown - 1, page_size - 1, -1):
+        del patch[index]
+    cursor["rows"] = min(shown, page_size)
+    return patch, cursor
 
 # Callback for updating the visibility of transaction table
 @app.callback(
@@ -591,50 +1245,6 @@ def toggle_transaction_table(data_type):
     else:
         return {"display": "none"}
 
-# Callback for updating metric cards
-@app.callback(
-    [
-        Output("tvl-value", "children"),
-        Output("fees-value", "children"),
-        Output("revenue-value", "children"),
-        Output("volume-value", "children"),
-        Output("chains-value", "children"),
-        Output("protocols-value", "children")
-    ],
-    [Input("apply-button", "n_clicks")],
-    [
-        State("protocol-dropdown", "value"),
-        State("chain-dropdown", "value"),
-        State("date-picker", "end_date")
-    ]
-)
-def update_metric_cards(n_clicks, protocol, chains, end_date):
-    # Filter data
-    df = protocol_data.copy()
-    df = df[df["protocol"] == protocol]
-    df = df[df["chain"].isin(chains)]
-
-    # Get latest date data
-    df_before_or_equal = df[df["date"] <= end_date]
-    latest_valid_date = df_before_or_equal["date"].max()
-    latest_data = df[df["date"] == latest_valid_date]
-    
-    # Calculate metrics
-    tvl = latest_data["tvl"].sum()
-    fees = latest_data["fees"].sum()
-    revenue = latest_data["revenue"].sum()
-    volume = latest_data["volume"].sum()
-    active_chains = len(latest_data["chain"].unique())
-    
-    return (
-        format_currency(tvl),
-        format_currency(fees),
-        format_currency(revenue),
-        format_currency(volume),
-        str(active_chains),
-        "1"  # Only one protocol is selected
-    )
-
 # Run the app
 if __name__ == "__main__":
     app.run_server(debug=True) 
\ No newline at end of file
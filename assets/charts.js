@@ -0,0 +1,198 @@
+// Clientside charts (CLIENT_CHARTS=1): the chain pie, chain bar chart and metric cards are
+// recomputed here from the protocol series app.py ships once per protocol, mirroring
+// chain_distribution_figure, protocol_comparison_figure and metric_card_values.
+(function () {
+    function formatCurrency(value) {
+        if (value >= 1e9) {
+            return "$" + (value / 1e9).toFixed(2) + "B";
+        } else if (value >= 1e6) {
+            return "$" + (value / 1e6).toFixed(2) + "M";
+        } else if (value >= 1e3) {
+            return "$" + (value / 1e3).toFixed(2) + "K";
+        }
+        return "$" + value.toFixed(2);
+    }
+
+    // Python's "{:.1f}" spelling of the non-finite shares an all-zero total produces
+    function fixed1(value) {
+        if (isNaN(value)) {
+            return "nan";
+        } else if (!isFinite(value)) {
+            return value > 0 ? "inf" : "-inf";
+        }
+        return value.toFixed(1);
+    }
+
+    function capitalize(text) {
+        return text.charAt(0).toUpperCase() + text.slice(1).toLowerCase();
+    }
+
+    // Date picker values may carry a time; the series dates are YYYY-MM-DD
+    function day(value) {
+        return value ? value.slice(0, 10) : null;
+    }
+
+    // [chain, total] for the chains with rows in the range, ordered by chain (NaN counts as 0)
+    function chainTotals(series, chains, metric, start, end) {
+        var totals = [];
+        (chains || []).forEach(function (chain) {
+            var values = series.chains[chain];
+            if (!values) {
+                return;
+            }
+            var total = 0;
+            var rows = 0;
+            values.rows.forEach(function (position, i) {
+                var date = series.dates[position];
+                if ((start && date < start) || (end && date > end)) {
+                    return;
+                }
+                rows += 1;
+                total += values[metric][i] || 0;
+            });
+            if (rows) {
+                totals.push([chain, total]);
+            }
+        });
+        return totals.sort(function (a, b) {
+            return a[0] < b[0] ? -1 : a[0] > b[0] ? 1 : 0;
+        });
+    }
+
+    // Metric cards from the latest rows at or before the end date
+    function cardValues(series, chains, end) {
+        var latest = null;
+        var selected = (chains || []).filter(function (chain) {
+            return series.chains[chain];
+        });
+        selected.forEach(function (chain) {
+            series.chains[chain].rows.forEach(function (position) {
+                var date = series.dates[position];
+                if ((!end || date <= end) && (latest === null || date > latest)) {
+                    latest = date;
+                }
+            });
+        });
+        var sums = {tvl: 0, fees: 0, revenue: 0, volume: 0};
+        var activeChains = 0;
+        selected.forEach(function (chain) {
+            var values = series.chains[chain];
+            var i = values.rows.findIndex(function (position) {
+                return series.dates[position] === latest;
+            });
+            if (i < 0) {
+                return;
+            }
+            activeChains += 1;
+            Object.keys(sums).forEach(function (metric) {
+                sums[metric] += values[metric][i] || 0;
+            });
+        });
+        return [
+            formatCurrency(sums.tvl),
+            formatCurrency(sums.fees),
+            formatCurrency(sums.revenue),
+            formatCurrency(sums.volume),
+            String(activeChains),
+            "1"
+        ];
+    }
+
+    function pieFigure(totals, metric, config) {
+        return {
+            data: [{
+                type: "pie",
+                labels: totals.map(function (t) { return t[0]; }),
+                values: totals.map(function (t) { return t[1]; }),
+                domain: {x: [0, 1], y: [0, 1]},
+                hole: 0.4,
+                hovertemplate: "chain=%{label}<br>" + metric + "=%{value}<extra></extra>",
+                legendgroup: "",
+                name: "",
+                showlegend: true,
+                insidetextfont: {size: 10},
+                textinfo: "percent",
+                textposition: "inside"
+            }],
+            layout: {
+                template: config.template,
+                legend: {tracegroupgap: 0, orientation: "h", yanchor: "bottom", y: -0.2, xanchor: "center", x: 0.5},
+                title: {text: capitalize(metric) + " Distribution"},
+                piecolorway: config.piecolorway,
+                margin: {l: 0, r: 0, t: 30, b: 0},
+                height: 250,
+                showlegend: true
+            }
+        };
+    }
+
+    function barFigure(totals, metric, config) {
+        var sorted = totals.slice().sort(function (a, b) {
+            return b[1] - a[1];
+        });
+        var values = sorted.map(function (t) { return t[1]; });
+        var total = values.reduce(function (sum, value) { return sum + value; }, 0);
+        var figure = {
+            data: [{
+                type: "bar",
+                orientation: "h",
+                x: values,
+                y: sorted.map(function (t) { return t[0]; }),
+                text: values,
+                texttemplate: "%{text:$.2s}",
+                textposition: "outside",
+                marker: {color: values, coloraxis: "coloraxis", pattern: {shape: ""}},
+                hovertemplate: metric + "=%{marker.color}<br>chain=%{y}<extra></extra>",
+                alignmentgroup: "True",
+                offsetgroup: "",
+                legendgroup: "",
+                name: "",
+                showlegend: false,
+                xaxis: "x",
+                yaxis: "y"
+            }],
+            layout: {
+                template: config.template,
+                xaxis: {anchor: "y", domain: [0, 1], title: {text: ""}},
+                yaxis: {anchor: "x", domain: [0, 1], title: {text: ""}},
+                coloraxis: {colorbar: {title: {text: metric}}, colorscale: config.colorscale, showscale: false},
+                legend: {tracegroupgap: 0},
+                title: {text: capitalize(metric) + " by Chain"},
+                barmode: "relative",
+                margin: {l: 0, r: 10, t: 30, b: 0},
+                showlegend: false
+            }
+        };
+        if (sorted.length) {
+            figure.layout.annotations = sorted.map(function (t) {
+                return {
+                    x: t[1],
+                    y: t[0],
+                    text: fixed1(t[1] / total * 100) + "%",
+                    showarrow: false,
+                    xshift: 45,
+                    font: {size: 9}
+                };
+            });
+        }
+        return figure;
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        charts: {
+            update: function (series, nClicks, metrics, chains, startDate, endDate, config, protocol, dataType) {
+                var noUpdate = window.dash_clientside.no_update;
+                // Pool data is charted on the server; a stale series waits for the new one
+                if (dataType !== "protocol" || !series || !config || series.protocol !== protocol) {
+                    return [noUpdate, noUpdate, noUpdate, noUpdate, noUpdate, noUpdate, noUpdate, noUpdate];
+                }
+                var metric = metrics && metrics.length ? metrics[0] : "tvl";
+                var totals = chainTotals(series, chains, metric, day(startDate), day(endDate));
+                return [
+                    pieFigure(totals, metric, config),
+                    barFigure(totals, metric, config)
+                ].concat(cardValues(series, chains, day(endDate)));
+            }
+        }
+    });
+})();
@@ -0,0 +1,106 @@
+"""Compare the merge-free protocol frame assembly against per-pair merges.
+
+Run from the repository root:
+
+    python benchmarks/bench_assembly.py [days]
+
+The old ``_assemble_protocol_data`` copied a date frame for every
+protocol x chain pair and merged TVL and the fee/revenue/volume flows into
+it one at a time. It is reproduced here as the baseline. Both run on the
+same synthetic payloads as protocols and chains grow, and must produce the
+same frame. Both timings include parsing the payloads, which they share.
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import data
+from catalog import Catalog
+from payloads import breakdown_payload, protocol_payload
+
+
+def legacy_tvl_to_df(tvl_data, chain):
+    tvl_series = tvl_data.get("chainTvls", {}).get(chain, {}).get("tvl", [])
+    return pd.DataFrame({
+        "date": pd.to_datetime([e["date"] for e in tvl_series], unit='s'),
+        "tvl": [e.get("totalLiquidityUSD", np.nan) for e in tvl_series]
+    })
+
+
+def legacy_assemble(raw_payloads, date_range, protocol_slugs, chains_of_interest):
+    base_df = pd.DataFrame({"date": date_range})
+    all_data = []
+    for protocol_name, slug in protocol_slugs.items():
+        flows = pd.concat([
+            data.breakdown_to_long(raw_payloads[slug]["fees"], "fees", chains_of_interest),
+            data.breakdown_to_long(raw_payloads[slug]["revenue"], "revenue", chains_of_interest),
+            data.breakdown_to_long(raw_payloads[slug]["volume"], "volume", chains_of_interest),
+        ])
+        flows = (
+            flows.groupby(["chain", "date", "metric"], observed=True)["value"].sum()
+            .unstack("metric")
+            .reindex(columns=["fees", "revenue", "volume"])
+        )
+        chains_with_flows = set(flows.index.get_level_values("chain"))
+        for chain in chains_of_interest:
+            df = base_df.copy()
+            tvl_df = legacy_tvl_to_df(raw_payloads[slug]["tvl"], chain)
+            if not tvl_df.empty:
+                df = df.merge(tvl_df, on="date", how="left")
+            else:
+                df['tvl'] = np.nan
+            if chain in chains_with_flows:
+                df = df.merge(flows.xs(chain, level="chain"), left_on="date", right_index=True, how="left")
+            else:
+                df[["fees", "revenue", "volume"]] = np.nan
+            df[data.PROTOCOL_METRICS] = df[data.PROTOCOL_METRICS].ffill()
+            df["protocol"] = protocol_name
+            df["chain"] = chain
+            df["expenses"] = df["fees"] - df["revenue"]
+            all_data.append(df)
+    return pd.concat(all_data, ignore_index=True)
+
+
+def synthetic_payloads(n_protocols, chains, days):
+    raw = {}
+    for i in range(n_protocols):
+        raw[f"protocol-{i}"] = {
+            "tvl": protocol_payload(days, chains, seed=i),
+            "fees": breakdown_payload(days, chains, seed=i + 1),
+            "revenue": breakdown_payload(days, chains, seed=i + 2),
+            "volume": breakdown_payload(days, chains, components=("DEX",), seed=i + 3),
+        }
+    return raw
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 365
+    date_range = data.generate_date_range(days)
+    print(f"{'protocols x chains':<20} {'rows':>8} {'merges':>9} {'merge-free':>11}")
+    for n_protocols, n_chains in [(5, 6), (20, 8), (50, 12), (100, 16)]:
+        chains = [f"Chain {i}" for i in range(n_chains)]
+        raw = synthetic_payloads(n_protocols, chains, days)
+        slugs = {f"Protocol {i}": f"protocol-{i}" for i in range(n_protocols)}
+
+        legacy_time, expected = timed(legacy_assemble, raw, date_range, slugs, chains)
+        new_time, result = timed(data._assemble_protocol_data, raw, date_range, None, Catalog.uniform(slugs, chains))
+        pd.testing.assert_frame_equal(
+            data.compact_frame(result, ["protocol", "chain"]), data.compact_frame(expected, ["protocol", "chain"])
+        )
+        label = f"{n_protocols} x {n_chains}"
+        print(f"{label:<20} {len(result):>8} {legacy_time:>8.2f}s {new_time:>10.2f}s  ({legacy_time / new_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Measure the startup fetch with a cold, warm and stale response cache.
+
+Run from the repository root:
+
+    python benchmarks/bench_cache.py
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import data
+from cache import DiskCache
+from http_client import HttpClient
+from stub_server import StubServer
+
+
+def timed(label, stub):
+    served, not_modified = stub.requests_served, stub.not_modified
+    start = time.perf_counter()
+    payloads = data.fetch_all_protocols(data.PROTOCOL_SLUGS.values())
+    elapsed = time.perf_counter() - start
+    assert all(p is not None for endpoints in payloads.values() for p in endpoints.values())
+    print(
+        f"{label:<22} {elapsed:6.3f}s  "
+        f"requests={stub.requests_served - served:<3} 304s={stub.not_modified - not_modified}"
+    )
+
+
+def main():
+    cache_dir = tempfile.mkdtemp(prefix="defillama-cache-")
+    try:
+        with StubServer(latency=0.2, days=2000) as stub:
+            data.API_BASE_URL = stub.url
+            # Back-to-back runs would otherwise be throttled by the per-host rate limit
+            data.http_client = HttpClient(pool_size=data.FETCH_CONCURRENCY)
+            data.response_cache = DiskCache(cache_dir, ttls=data.CACHE_TTLS)
+
+            timed("cold cache", stub)
+            timed("warm cache", stub)
+
+            # Expire everything so each entry has to be revalidated
+            data.response_cache.default_ttl = 0
+            data.response_cache.ttls = {}
+            timed("stale, revalidated", stub)
+
+            data.OFFLINE = True
+            timed("offline, stale", stub)
+    finally:
+        data.OFFLINE = False
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Per-click cost of the metric cards: latest rows at or before the end date.
+
+Run from the repository root:
+
+    python benchmarks/bench_cards.py [protocols] [years]
+
+Builds a synthetic protocol frame (protocols x all stub chains x years of
+daily rows) and times the card values for one protocol three ways: the old
+filter + max(date) + mask over the filtered rows, FrameIndex.latest (one
+binary search per chain), and a repeat hitting the per-version card cache.
+It then times the startup headline totals over the whole frame: the old
+max + mask scan vs FrameIndex.latest over every (protocol, chain).
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_rollup import synthetic_protocol_frame
+from cache import LRUCache
+from payloads import STUB_CHAINS
+from query import FrameIndex
+
+CARD_METRICS = ["tvl", "fees", "revenue", "volume"]
+REPEATS = 200
+
+
+def old_cards(index, protocol, chains, end_date):
+    df = index.filter(protocol, chains, end_date=end_date)
+    latest_data = df[df["date"] == df["date"].max()]
+    return [latest_data[metric].sum() for metric in CARD_METRICS] + [len(latest_data["chain"].unique())]
+
+
+def new_cards(index, protocol, chains, end_date):
+    _, totals, active = index.latest([(protocol, chain) for chain in chains], CARD_METRICS, end_date)
+    return [totals[metric] for metric in CARD_METRICS] + [len(active)]
+
+
+def cached_cards(cache, index, protocol, chains, end_date):
+    key = (protocol, tuple(chains), end_date)
+    values = cache.get(key)
+    if values is None:
+        values = new_cards(index, protocol, chains, end_date)
+        cache.put(key, values)
+    return values
+
+
+def old_headline(df):
+    latest_data = df[df["date"] == df["date"].max()]
+    return [latest_data[metric].sum() for metric in CARD_METRICS] + [len(latest_data)]
+
+
+def new_headline(index):
+    _, totals, keys = index.latest(list(index.groups), CARD_METRICS)
+    return [totals[metric] for metric in CARD_METRICS] + [len(keys)]
+
+
+def timed(fn, *args, repeats=REPEATS):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        result = fn(*args)
+    return (time.perf_counter() - start) / repeats, result
+
+
+def same(a, b):
+    return all(abs(x - y) <= 1e-9 * max(abs(x), abs(y), 1.0) for x, y in zip(a, b))
+
+
+def main():
+    n_protocols = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    years = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    df, dates = synthetic_protocol_frame(n_protocols, years)
+    index = FrameIndex(df)
+    end_date = str(dates[-30].date())
+    print(f"{len(df):,} rows ({n_protocols} protocols x {len(STUB_CHAINS)} chains x {len(dates)} days)")
+
+    args = (index, "Protocol 0", STUB_CHAINS, end_date)
+    old_time, old = timed(old_cards, *args, repeats=REPEATS // 10)
+    new_time, new = timed(new_cards, *args)
+    cache = LRUCache()
+    cached_time, cached = timed(cached_cards, cache, *args)
+    assert same(old, new) and same(old, cached), (old, new, cached)
+    print(f"{'cards: filter + mask':<28} {old_time * 1e6:>10.0f}us")
+    print(f"{'cards: binary search':<28} {new_time * 1e6:>10.0f}us")
+    print(f"{'cards: cached':<28} {cached_time * 1e6:>10.1f}us")
+
+    old_time, old = timed(old_headline, df, repeats=5)
+    new_time, new = timed(new_headline, index, repeats=5)
+    assert same(old, new), (old, new)
+    print(f"{'headline: max + mask':<28} {old_time * 1e6:>10.0f}us")
+    print(f"{'headline: binary search':<28} {new_time * 1e6:>10.0f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Time series figure size over long histories: every day vs downsampled to the graph width.
+
+Run from the repository root:
+
+    python benchmarks/bench_downsample.py [years]
+
+Imports the app against the local stub server, then builds the time series
+figure for one protocol with all five metrics over a synthetic daily
+history (all stub chains, default 10 years) for several date ranges: once
+with every day, and once downsampled to a 1000px graph with LTTB and with
+min-max buckets. The last rows zoom into a quarter of the range, which
+re-fetches that window at full resolution.
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from payloads import STUB_CHAINS
+from query import FrameIndex
+from stub_server import StubServer
+
+METRICS = ["tvl", "fees", "revenue", "expenses", "volume"]
+WIDTH = 1000
+
+
+def synthetic_history(years, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(end=pd.Timestamp.today().normalize(), periods=365 * years, freq="D")
+    df = pd.DataFrame({
+        "date": np.tile(dates.values, len(STUB_CHAINS)),
+        "protocol": "Aave",
+        "chain": np.repeat(STUB_CHAINS, len(dates)),
+    })
+    # Random walks, so the lines have trends and spikes worth keeping
+    for metric in METRICS:
+        steps = rng.normal(0, 1e6, len(df)).reshape(len(STUB_CHAINS), -1)
+        df[metric] = (np.abs(np.cumsum(steps, axis=1)) + 1e7).ravel()
+    return df, dates
+
+
+def build(app, df, points, x_range=None):
+    start = time.perf_counter()
+    figure = app.time_series_figure(df, METRICS, "protocol", points, x_range)
+    size = len(figure.to_json())
+    elapsed = time.perf_counter() - start
+    return size, max(len(trace.x) for trace in figure.data), elapsed
+
+
+def main():
+    years = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    cache_dir = tempfile.mkdtemp(prefix="defillama-cache-")
+    os.environ.update(DEFILLAMA_CACHE_DIR=cache_dir, REFRESH_INTERVAL="0")
+    try:
+        with StubServer(latency=0.0) as stub:
+            os.environ["DEFILLAMA_API_URL"] = stub.url
+            import app
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    df, dates = synthetic_history(years)
+    index = FrameIndex(df)
+    points = app.time_series_points(WIDTH)
+    ranges = [(f"{n} year{'s' * (n > 1)}", dates[-1] - pd.Timedelta(days=365 * n), dates[-1])
+              for n in (1, 3, years)]
+
+    build(app, index.filter("Aave", STUB_CHAINS), None)  # warm up plotly's validators
+    print(f"{len(dates)} days x {len(STUB_CHAINS)} chains x {len(METRICS)} metrics, {WIDTH}px graph")
+    print(f"{'range':<24} {'method':<8} {'points':>7} {'bytes':>11} {'build':>8}")
+    for label, start, end in ranges:
+        rows = index.filter("Aave", STUB_CHAINS, start, end)
+        for method, budget in [("every", None), ("lttb", points), ("minmax", points)]:
+            app.DOWNSAMPLE_METHOD = method
+            size, n, elapsed = build(app, rows, budget)
+            print(f"{label:<24} {method:<8} {n:>7} {size:>10,}B {elapsed * 1000:>6.1f}ms")
+
+    # Zooming into the last quarter of the full range plots that window at full resolution
+    app.DOWNSAMPLE_METHOD = "lttb"
+    start = dates[-1] - (dates[-1] - dates[0]) / 4
+    x_range = [str(start), str(dates[-1])]
+    rows = index.filter("Aave", STUB_CHAINS, start - pd.Timedelta(days=1), dates[-1])
+    size, n, elapsed = build(app, rows, points, x_range)
+    print(f"{'zoom: last quarter':<24} {'lttb':<8} {n:>7} {size:>10,}B {elapsed * 1000:>6.1f}ms")
+    zoomed = index.filter("Aave", STUB_CHAINS, dates[-1] - pd.Timedelta(days=90), dates[-1])
+    size, n, elapsed = build(app, zoomed, points, [str(dates[-1] - pd.Timedelta(days=90)), str(dates[-1])])
+    print(f"{'zoom: last 90 days':<24} {'lttb':<8} {n:>7} {size:>10,}B {elapsed * 1000:>6.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Compare serial vs concurrent fetching in data.fetch_all_protocols.
+
+Run from the repository root:
+
+    python benchmarks/bench_fetch.py
+
+Each stub endpoint answers after a different latency. Serial fetching should
+take roughly the sum of all latencies, concurrent fetching roughly the slowest
+single request.
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import data
+from cache import DiskCache
+from http_client import HttpClient
+from stub_server import StubServer
+
+
+def latency_for(path):
+    # Deterministic spread between 50ms and 250ms per endpoint
+    return 0.05 + (zlib.crc32(path.encode()) % 200) / 1000
+
+
+def run(max_workers):
+    # Fresh empty cache per run so every request really goes to the stub
+    cache_dir = tempfile.mkdtemp(prefix="defillama-cache-")
+    data.response_cache = DiskCache(cache_dir)
+    start = time.perf_counter()
+    payloads = data.fetch_all_protocols(data.PROTOCOL_SLUGS.values(), max_workers=max_workers)
+    elapsed = time.perf_counter() - start
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    assert all(p is not None for endpoints in payloads.values() for p in endpoints.values())
+    return elapsed
+
+
+def main():
+    with StubServer(latency=latency_for) as stub:
+        data.API_BASE_URL = stub.url
+        # Back-to-back runs would otherwise be throttled by the per-host rate limit
+        data.http_client = HttpClient(pool_size=data.FETCH_CONCURRENCY)
+        paths = set()
+        for slug in data.PROTOCOL_SLUGS.values():
+            paths.update([
+                f"/protocol/{slug}",
+                f"/summary/fees/{slug}",
+                f"/summary/dexs/{slug}",
+            ])
+        # fees and revenue share a path, so count that latency twice
+        latencies = [latency_for(p) * (2 if p.startswith("/summary/fees/") else 1) for p in paths]
+
+        print(f"requests:          {len(data.PROTOCOL_SLUGS) * len(data.FETCHERS)}")
+        print(f"sum of latencies:  {sum(latencies):.3f}s")
+        print(f"slowest request:   {max(latency_for(p) for p in paths):.3f}s")
+        print(f"serial fetch:      {run(max_workers=1):.3f}s")
+        print(f"concurrent fetch:  {run(max_workers=data.FETCH_CONCURRENCY):.3f}s  (FETCH_CONCURRENCY={data.FETCH_CONCURRENCY})")
+        print(f"unbounded fetch:   {run(max_workers=len(data.PROTOCOL_SLUGS) * len(data.FETCHERS)):.3f}s")
+
+
+if __name__ == "__main__":
+    main()
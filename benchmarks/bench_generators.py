@@ -0,0 +1,141 @@
+"""Compare the vectorized synthetic data generators against the old row loops.
+
+Run from the repository root:
+
+    python benchmarks/bench_generators.py [days] [n_pools]
+
+The old ``generate_pool_data`` drew a handful of scalars and appended one
+dict per pool/day/chain, and the old ``generate_transaction_data`` drew
+every wallet and hash one hex character at a time. Both are reproduced here
+as baselines and timed on the same sizes as the vectorized versions.
+"""
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import data
+
+
+def legacy_pool_data(pools, date_range):
+    data_rows = []
+    for pool in pools:
+        base_tvl = np.random.uniform(10000000, 500000000)
+        base_fees = np.random.uniform(5000, 100000)
+        base_volume = np.random.uniform(1000000, 50000000)
+        base_utilization = np.random.uniform(0.3, 0.7) if 'Supply' in pool['name'] or 'Borrow' in pool['name'] else None
+        base_supply_rate = np.random.uniform(0.01, 0.1) if 'Supply' in pool['name'] else None
+        base_borrow_rate = np.random.uniform(0.03, 0.15) if 'Borrow' in pool['name'] else None
+
+        for date in date_range:
+            day_factor = 1 + 0.001 * (date_range.get_loc(date) - len(date_range)/2)
+            day_factor *= np.random.uniform(0.93, 1.07)
+            valid_chains = data.POOL_CHAINS if pool['protocol'] != 'dYdX' else ['Ethereum', 'Base']
+
+            for chain in valid_chains:
+                if np.random.random() > 0.6:
+                    continue
+                row = {
+                    'date': date,
+                    'protocol': pool['protocol'],
+                    'pool_name': pool['name'],
+                    'version': pool['version'],
+                    'chain': chain,
+                    'tvl': base_tvl * day_factor * np.random.uniform(0.8, 1.2),
+                    'fees': base_fees * day_factor * np.random.uniform(0.7, 1.3),
+                    'volume': base_volume * day_factor * np.random.uniform(0.5, 1.5),
+                }
+                if pool['protocol'] in ['Aave', 'Compound']:
+                    utilization = base_utilization * day_factor * np.random.uniform(0.9, 1.1)
+                    row['utilization_rate'] = min(max(utilization, 0.1), 0.95)
+                    if 'Supply' in pool['name']:
+                        row['supply_rate'] = base_supply_rate * day_factor * np.random.uniform(0.9, 1.1)
+                    if 'Borrow' in pool['name']:
+                        row['borrow_rate'] = base_borrow_rate * day_factor * np.random.uniform(0.9, 1.1)
+                data_rows.append(row)
+    return pd.DataFrame(data_rows).sort_values(["protocol", "chain", "date"], kind="stable", ignore_index=True)
+
+
+def legacy_transaction_data(n_transactions):
+    rows = []
+    for _ in range(n_transactions):
+        protocol = np.random.choice(data.TX_PROTOCOLS)
+        if protocol in ['Uniswap', 'Curve']:
+            action = 'Swap'
+        elif protocol in ['Aave', 'Compound']:
+            action = np.random.choice(['Supply', 'Borrow', 'Repay', 'Withdraw'])
+        else:
+            action = np.random.choice(data.TX_ACTIONS)
+        tx_time = datetime.now() - timedelta(days=np.random.uniform(0, 7))
+        wallet = '0x' + ''.join(np.random.choice(list('0123456789abcdef'), 40))
+        if action == 'Swap':
+            amount = np.random.uniform(100, 50000)
+        elif action in ['Supply', 'Borrow']:
+            amount = np.random.uniform(1000, 100000)
+        else:
+            amount = np.random.uniform(500, 20000)
+        rows.append({
+            'timestamp': tx_time,
+            'protocol': protocol,
+            'chain': np.random.choice(data.TX_CHAINS),
+            'wallet_address': wallet,
+            'action': action,
+            'amount_usd': amount,
+            'gas_fee_usd': np.random.uniform(5, 100),
+            'transaction_hash': '0x' + ''.join(np.random.choice(list('0123456789abcdef'), 64)),
+        })
+    return pd.DataFrame(rows)
+
+
+def streamed_rows(n_transactions, chunk_size):
+    return sum(len(chunk) for chunk in data.iter_transaction_data(n_transactions, chunk_size, seed=0))
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def main():
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 365
+    n_pools = int(sys.argv[2]) if len(sys.argv) > 2 else 120
+    pools = data._pool_list(n_pools)
+    date_range = data.generate_date_range(days)
+
+    legacy_time, legacy_df = timed(legacy_pool_data, pools, date_range)
+    new_time, new_df = timed(data.generate_pool_data, days=days, n_pools=n_pools, seed=0)
+
+    # Same columns (labels are now categorical); row counts differ only by the random chain draws
+    assert list(new_df.columns) == list(legacy_df.columns)
+
+    print(f"pools: {n_pools} pools x {days} days")
+    print(f"row loop:   {legacy_time:.3f}s  ({len(legacy_df)} rows)")
+    print(f"vectorized: {new_time:.3f}s  ({len(new_df)} rows, {legacy_time / new_time:.0f}x faster)")
+
+    big_days, big_pools = 365 * 3, 2000
+    big_time, big_df = timed(data.generate_pool_data, days=big_days, n_pools=big_pools, seed=0)
+    print(f"vectorized, {big_pools} pools x {big_days} days: {big_time:.3f}s  ({len(big_df)} rows)")
+
+    n_tx = 20000
+    legacy_time, legacy_df = timed(legacy_transaction_data, n_tx)
+    new_time, new_df = timed(data.generate_transaction_data, n_tx, seed=0)
+    assert list(new_df.columns) == list(legacy_df.columns)
+    assert new_df["wallet_address"].str.fullmatch(r"0x[0-9a-f]{40}").all()
+    assert new_df["transaction_hash"].str.fullmatch(r"0x[0-9a-f]{64}").all()
+
+    print(f"transactions: {n_tx} rows")
+    print(f"row loop:   {legacy_time:.3f}s")
+    print(f"vectorized: {new_time:.3f}s  ({legacy_time / new_time:.0f}x faster)")
+
+    stream_time, n_rows = timed(streamed_rows, 2000000, 250000)
+    print(f"streamed in 250k-row chunks: {n_rows} rows in {stream_time:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
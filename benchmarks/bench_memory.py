@@ -0,0 +1,50 @@
+"""Memory and filter cost of compact (categorical/float32) frames vs object/float64.
+
+Run from the repository root:
+
+    python benchmarks/bench_memory.py [days] [n_pools]
+
+Builds a multi-year pool frame, then compares the old layout (object
+strings, float64 metrics) against categorical labels with float64 and
+float32 metrics: bytes per frame and the time of a protocol/chain mask.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import data
+
+LABELS = ["protocol", "pool_name", "version", "chain"]
+
+
+def mask_time(df, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        mask = (df["protocol"] == "Aave") & df["chain"].isin(["Ethereum", "Base"])
+        best = min(best, time.perf_counter() - start)
+    return best, int(mask.sum())
+
+
+def main():
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 365 * 3
+    n_pools = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    compact = data.generate_pool_data(days=days, n_pools=n_pools, seed=0)
+    metrics = [column for column in compact.columns if compact[column].dtype.kind == "f"]
+
+    layouts = {
+        "object + float64": compact.astype({**{c: object for c in LABELS}, **{c: "float64" for c in metrics}}),
+        "categorical + float64": compact.astype({c: "float64" for c in metrics}),
+        "categorical + float32": compact.astype({c: "float32" for c in metrics}),
+    }
+    print(f"pool frame: {n_pools} pools x {days} days ({len(compact)} rows)")
+    for label, df in layouts.items():
+        size = df.memory_usage(index=False, deep=True).sum()
+        seconds, matches = mask_time(df)
+        print(f"{label:<24} {size / 1e6:9.1f} MB   protocol/chain mask {seconds * 1000:7.1f}ms ({matches} rows)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Compare the single-pass breakdown parser against the old per-chain parsers.
+
+Run from the repository root:
+
+    python benchmarks/bench_parse.py [days]
+
+The old ``fees_to_df``/``revenue_to_df``/``volume_to_df`` walked the whole
+``totalDataChartBreakdown`` list once per chain and built a ``pd.to_datetime``
+scalar per row. They are reproduced here as the baseline.
+"""
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import data
+from payloads import STUB_CHAINS, breakdown_payload
+
+
+def legacy_to_df(payload, chain, metric):
+    parsed = []
+    for timestamp, breakdown in payload.get("totalDataChartBreakdown", []):
+        chain_data = breakdown.get(chain.lower())
+        if not chain_data:
+            continue
+        parsed.append({"date": pd.to_datetime(timestamp, unit="s"), metric: sum(chain_data.values())})
+    return pd.DataFrame(parsed)
+
+
+def legacy(payloads, chains):
+    return {
+        (metric, chain): legacy_to_df(payload, chain, metric)
+        for metric, payload in payloads.items()
+        for chain in chains
+    }
+
+
+def single_pass(payloads, chains):
+    return pd.concat([data.breakdown_to_long(payload, metric, chains) for metric, payload in payloads.items()])
+
+
+def best_of(fn, *args, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    chains = STUB_CHAINS
+    payloads = {
+        metric: breakdown_payload(days, chains, components=("Lending", "DEX", "Vaults"), seed=i)
+        for i, metric in enumerate(["fees", "revenue", "volume"])
+    }
+
+    legacy_time, legacy_frames = best_of(legacy, payloads, chains)
+    new_time, long_df = best_of(single_pass, payloads, chains)
+
+    # Both approaches must agree row for row
+    for (metric, chain), expected in legacy_frames.items():
+        got = long_df[(long_df["metric"] == metric) & (long_df["chain"] == chain)]
+        pd.testing.assert_series_equal(
+            got["value"].reset_index(drop=True), expected[metric].reset_index(drop=True), check_names=False
+        )
+        assert (got["date"].values == expected["date"].values).all()
+
+    print(f"payload: {days} days x {len(chains)} chains x 3 metrics ({len(long_df)} rows)")
+    print(f"per-chain parsers: {legacy_time:.3f}s")
+    print(f"single pass:       {new_time:.3f}s  ({legacy_time / new_time:.0f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
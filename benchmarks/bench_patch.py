@@ -0,0 +1,97 @@
+"""Bytes sent per "Apply Filters" click: whole figures vs Patch updates.
+
+Run from the repository root:
+
+    python benchmarks/bench_patch.py
+
+Imports the app against the local stub server and replays a sequence of
+filter changes through update_dashboard, each time passing the figure keys
+the previous click returned, as the browser does. Every Patch is applied
+to the figure it was computed against and must reproduce the whole figure
+(apart from the autorange reset it adds).
+"""
+import copy
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from dash import Patch
+from plotly.io.json import to_json_plotly
+
+from stub_server import StubServer
+
+GRAPHS = ["time series", "chain pie", "chain bars"]
+
+
+def apply_patch(figure, patch):
+    """Apply a Patch's operations the way the Dash renderer does."""
+    figure = copy.deepcopy(figure)
+    for operation in patch.to_plotly_json()["operations"]:
+        *path, last = operation["location"]
+        target = figure
+        for part in path:
+            target = target[part]
+        name = operation["operation"]
+        if name == "Assign":
+            target[last] = operation["params"]["value"]
+        elif name == "Delete":
+            del target[last]
+        elif name == "Extend":
+            target[last].extend(operation["params"]["value"])
+        else:
+            raise ValueError(name)
+    return figure
+
+
+def without_autorange(figure):
+    figure = copy.deepcopy(figure)
+    for axis in ("xaxis", "yaxis"):
+        figure.get("layout", {}).get(axis, {}).pop("autorange", None)
+    return figure
+
+
+def main():
+    cache_dir = tempfile.mkdtemp(prefix="defillama-cache-")
+    os.environ.update(DEFILLAMA_CACHE_DIR=cache_dir, REFRESH_INTERVAL="0")
+    try:
+        with StubServer(latency=0.0, days=400) as stub:
+            os.environ["DEFILLAMA_API_URL"] = stub.url
+            import app
+
+            first, last = app.first_date.strftime("%Y-%m-%d"), app.last_date.strftime("%Y-%m-%d")
+            month_before = (app.last_date - pd.Timedelta(days=30)).strftime("%Y-%m-%d")
+            steps = [
+                ("first load", "Aave", app.chains, first, month_before, ["tvl", "fees"]),
+                ("end date +30 days", "Aave", app.chains, first, last, ["tvl", "fees"]),
+                ("add a metric", "Aave", app.chains, first, last, ["tvl", "fees", "revenue"]),
+                ("drop a metric", "Aave", app.chains, first, last, ["tvl", "fees"]),
+                ("drop a chain", "Aave", app.chains[1:], first, last, ["tvl", "fees"]),
+                ("change protocol", "Fluid", app.chains[1:], first, last, ["tvl", "fees"]),
+                ("same filters again", "Fluid", app.chains[1:], first, last, ["tvl", "fees"]),
+            ]
+
+            print(f"{'click':<20} {'whole figures':>14} {'patches':>10}")
+            shown, shown_keys = None, None
+            for label, protocol, chains, start, end, metrics in steps:
+                outputs = app.update_dashboard(1, protocol, chains, start, end, metrics, "protocol", "all", "auto", shown_keys, None)
+                updates, shown_keys = outputs[:3], outputs[-1]
+                key = tuple(tuple(p) if isinstance(p, list) else p for p in shown_keys[0])
+                figures = app.figure_cache.get(key)
+                for position, update in enumerate(updates):
+                    if isinstance(update, Patch):
+                        patched = without_autorange(apply_patch(shown[position], update))
+                        assert patched == figures[position], f"{label}: {GRAPHS[position]} patch mismatch"
+                full_bytes = sum(len(to_json_plotly(figure)) for figure in figures)
+                sent_bytes = sum(len(to_json_plotly(update)) for update in updates if update is not app.no_update)
+                print(f"{label:<20} {full_bytes:>13,}B {sent_bytes:>9,}B")
+                shown = figures
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Time series query over long ranges: daily rows vs the weekly/monthly pyramid levels.
+
+Run from the repository root:
+
+    python benchmarks/bench_pyramid.py [years]
+
+Builds a synthetic daily history for one protocol on every stub chain
+(default 10 years) and times the time series query for several ranges:
+slice the rows, then sum the selected chains per date, as
+time_series_figure does. "daily" groups every day; "auto" reads the
+pyramid level GRANULARITY_MAX_PERIODS picks for the range. Each level is
+checked against resampling the daily rows (last TVL, summed flows).
+"""
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_downsample import METRICS, synthetic_history
+from dataset import STOCK_METRICS
+from payloads import STUB_CHAINS
+from query import PYRAMID_PERIODS, FrameIndex, RollupCube, TimePyramid
+
+MAX_PERIODS = 200
+REPEATS = 20
+
+
+def time_query(pyramid, level, start, end):
+    started = time.perf_counter()
+    for _ in range(REPEATS):
+        rows = pyramid.filter(level, "Aave", STUB_CHAINS, start, end)
+        series = rows.groupby("date")[METRICS].sum()
+    return (time.perf_counter() - started) / REPEATS, len(rows), len(series)
+
+
+def check(pyramid, index, level, start, end):
+    rows = index.filter("Aave", STUB_CHAINS, start, end)
+    periods = rows["date"].dt.to_period(PYRAMID_PERIODS[level]).dt.start_time.clip(lower=start)
+    aggregations = {metric: "last" if metric in STOCK_METRICS else "sum" for metric in METRICS}
+    expected = rows.groupby([rows["chain"], periods], observed=True).agg(aggregations).groupby("date").sum()
+    got = pyramid.filter(level, "Aave", STUB_CHAINS, start, end).groupby("date")[METRICS].sum()
+    pd.testing.assert_frame_equal(got, expected[METRICS], check_names=False, rtol=1e-9)
+
+
+def main():
+    years = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    df, dates = synthetic_history(years)
+    started = time.perf_counter()
+    index = FrameIndex(df)
+    pyramid = TimePyramid(RollupCube(index), STOCK_METRICS)
+    build = time.perf_counter() - started
+    levels = {level: len(pyramid.levels[level].df) for level in pyramid.levels}
+    print(f"{len(dates)} days x {len(STUB_CHAINS)} chains, pyramid built in {build * 1000:.0f}ms: "
+          + ", ".join(f"{rows:,} {level} rows" for level, rows in levels.items()))
+
+    print(f"{'range':<10} {'level':<16} {'rows':>7} {'points':>7} {'query':>9}")
+    for n in (1, 3, years):
+        label = f"{n} year{'s' * (n > 1)}"
+        # Start mid-week and mid-month, so both ends are partial periods
+        start, end = dates[-1] - pd.Timedelta(days=365 * n - 3), dates[-1]
+        auto = pyramid.level_for(start, end, MAX_PERIODS)
+        for level, name in [("daily", "daily"), (auto, f"auto ({auto})")]:
+            elapsed, rows, points = time_query(pyramid, level, start, end)
+            print(f"{label:<10} {name:<16} {rows:>7,} {points:>7,} {elapsed * 1000:>7.2f}ms")
+        for level in PYRAMID_PERIODS:
+            check(pyramid, index, level, start, end)
+    print("weekly and monthly levels match resampled daily rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Startup fetch against a faulty API: bare session vs retries vs retries + circuit breaker.
+
+Run from the repository root:
+
+    python benchmarks/bench_resilience.py
+
+The old fetch path was a pooled session with no timeout, no retries and no
+breaker; it is reproduced as an HttpClient with all three turned off. Each
+client runs data.fetch_all_protocols against a stub server that injects:
+
+- flaky: every endpoint's first request fails with a 503, or a 429 with Retry-After
+- stalled: one endpoint's first request takes 10s to answer
+- outage: every request fails with a 500; a stale cached copy exists
+
+It reports wall time, payloads missing (which became NaN columns), and the
+requests that reached the stub.
+"""
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import data
+from cache import DiskCache
+from http_client import HttpClient
+from stub_server import StubServer
+
+# More protocols than FETCH_CONCURRENCY, so an outage outlasts the first wave of requests
+SLUGS = [f"protocol-{i}" for i in range(25)]
+STALLED_PATH = "/protocol/protocol-0"
+
+
+def flaky(path, attempt):
+    if attempt > 0:
+        return None
+    return (429, 0.2) if zlib.crc32(path.encode()) % 2 else 503
+
+
+def outage(path, attempt):
+    return 500
+
+
+def stalled_latency():
+    seen = set()
+
+    def latency(path):
+        if path == STALLED_PATH and path not in seen:
+            seen.add(path)
+            return 10.0
+        return 0.02
+    return latency
+
+
+CLIENTS = {
+    "bare session": lambda: HttpClient(timeout=None, retries=0, breaker_threshold=0),
+    "timeouts + retries": lambda: HttpClient(timeout=(1.0, 2.0), retries=3, backoff=0.1, breaker_threshold=0),
+    "+ circuit breaker": lambda: HttpClient(timeout=(1.0, 2.0), retries=3, backoff=0.1, breaker_threshold=5),
+}
+
+
+def run(client, scenario):
+    cache_dir = tempfile.mkdtemp(prefix="defillama-cache-")
+    latency = stalled_latency() if scenario == "stalled" else 0.02
+    with StubServer(latency=latency) as stub:
+        data.API_BASE_URL = stub.url
+        data.http_client = client
+        data.response_cache = DiskCache(cache_dir)
+        if scenario == "outage":
+            data.fetch_all_protocols(SLUGS)
+            # Every cached entry is stale, so each fetch goes to the (failing) API first
+            data.response_cache = DiskCache(cache_dir, default_ttl=0)
+            stub.faults = outage
+        elif scenario == "flaky":
+            stub.faults = flaky
+        served_before = stub.requests_served
+
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            payloads = data.fetch_all_protocols(SLUGS)
+        elapsed = time.perf_counter() - start
+        requests_served = stub.requests_served - served_before
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    missing = sum(payload is None for endpoints in payloads.values() for payload in endpoints.values())
+    return elapsed, missing, requests_served
+
+
+def main():
+    total = len(SLUGS) * len(data.FETCHERS)
+    print(f"{total} endpoint requests per startup fetch")
+    print(f"{'scenario':<9} {'client':<20} {'time':>7} {'missing':>8} {'requests':>9}")
+    for scenario in ["flaky", "stalled", "outage"]:
+        for label, make_client in CLIENTS.items():
+            elapsed, missing, requests_served = run(make_client(), scenario)
+            print(f"{scenario:<9} {label:<20} {elapsed:>6.2f}s {missing:>8} {requests_served:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Per-click cost of the chain distribution/comparison totals at scale.
+
+Run from the repository root:
+
+    python benchmarks/bench_rollup.py [protocols] [years]
+
+Builds a synthetic protocol frame (protocols x all stub chains x years of
+daily rows) and times one "sum the selected metric per chain over a date
+range" query three ways: the old copy-and-mask + groupby, summing
+FrameIndex slices, and RollupCube prefix-sum differences.
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from payloads import STUB_CHAINS
+from query import FrameIndex, RollupCube
+
+METRICS = ["tvl", "fees", "revenue", "expenses", "volume"]
+
+
+def synthetic_protocol_frame(n_protocols, years, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(end=pd.Timestamp.today().normalize(), periods=365 * years, freq="D")
+    protocols = [f"Protocol {i}" for i in range(n_protocols)]
+    n_series = n_protocols * len(STUB_CHAINS)
+    n = n_series * len(dates)
+    df = pd.DataFrame({
+        "date": np.tile(dates.values, n_series),
+        "protocol": np.repeat(protocols, len(STUB_CHAINS) * len(dates)),
+        "chain": np.tile(np.repeat(STUB_CHAINS, len(dates)), n_protocols),
+    })
+    for metric in METRICS:
+        df[metric] = rng.uniform(1e3, 1e9, n)
+    return df, dates
+
+
+def mask_and_groupby(df, protocol, chains, start, end, metric):
+    df = df.copy()
+    df = df[df["protocol"] == protocol]
+    df = df[df["chain"].isin(chains)]
+    df = df[(df["date"] >= start) & (df["date"] <= end)]
+    return df.groupby("chain")[metric].sum()
+
+
+def index_slices(index, protocol, chains, start, end, metric):
+    return {chain: view[metric].sum() for chain, view in index.slices(protocol, chains, start, end)}
+
+
+def rollup(cube, protocol, chains, start, end, metric):
+    return dict(cube.totals_by_chain(protocol, chains, metric, start, end))
+
+
+def per_call(fn, *args, repeat=5):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn(*args)
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    n_protocols = int(sys.argv[1]) if len(sys.argv) > 1 else 120
+    years = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+
+    df, dates = synthetic_protocol_frame(n_protocols, years)
+    print(f"{n_protocols} protocols x {len(STUB_CHAINS)} chains x {len(dates)} days = {len(df):,} rows")
+
+    start = time.perf_counter()
+    index = FrameIndex(df)
+    cube = RollupCube(index)
+    print(f"index + rollup build:  {time.perf_counter() - start:8.3f}s (once per refresh)")
+
+    protocol = "Protocol 7"
+    query_start, query_end = str(dates[-365].date()), str(dates[-1].date())
+    args = (protocol, STUB_CHAINS, query_start, query_end, "fees")
+
+    mask_time, expected = per_call(mask_and_groupby, df, *args)
+    slice_time, sliced = per_call(index_slices, index, *args, repeat=50)
+    cube_time, rolled = per_call(rollup, cube, *args, repeat=50)
+
+    for chain in STUB_CHAINS:
+        assert np.isclose(expected[chain], sliced[chain]) and np.isclose(expected[chain], rolled[chain])
+
+    print(f"copy + mask + groupby: {mask_time * 1e3:8.2f}ms per click")
+    print(f"index slices + sum:    {slice_time * 1e3:8.2f}ms per click")
+    print(f"rollup prefix sums:    {cube_time * 1e3:8.2f}ms per click")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Synthetic payloads shaped like the DefiLlama endpoints data.py consumes."""
+import numpy as np
+from datetime import date, datetime, timedelta, timezone
+
+STUB_CHAINS = ['Ethereum', 'Polygon', 'Arbitrum', 'OP Mainnet', 'Base', 'Solana', 'Avalanche', 'BSC']
+
+
+def _daily_timestamps(days):
+    end = datetime.combine(date.today(), datetime.min.time(), tzinfo=timezone.utc)
+    start = end - timedelta(days=days - 1)
+    return [int((start + timedelta(days=i)).timestamp()) for i in range(days)]
+
+
+def protocol_payload(days=365, chains=STUB_CHAINS, seed=0):
+    """Shape of /protocol/{slug}: per-chain TVL history."""
+    rng = np.random.default_rng(seed)
+    timestamps = _daily_timestamps(days)
+    chain_tvls = {}
+    for chain in chains:
+        values = rng.uniform(1e6, 1e9, days)
+        chain_tvls[chain] = {
+            "tvl": [{"date": ts, "totalLiquidityUSD": float(v)} for ts, v in zip(timestamps, values)]
+        }
+    return {"chainTvls": chain_tvls}
+
+
+def breakdown_payload(days=365, chains=STUB_CHAINS, components=("Lending", "DEX"), seed=0):
+    """Shape of /summary/fees/{slug} and /summary/dexs/{slug}: per-day chain breakdown."""
+    rng = np.random.default_rng(seed)
+    timestamps = _daily_timestamps(days)
+    values = rng.uniform(1e3, 1e6, (days, len(chains), len(components)))
+    breakdown = []
+    for i, ts in enumerate(timestamps):
+        breakdown.append([
+            ts,
+            {
+                chain.lower(): {component: float(values[i, j, k]) for k, component in enumerate(components)}
+                for j, chain in enumerate(chains)
+            },
+        ])
+    return {"totalDataChartBreakdown": breakdown}
+
+
+# Chains each stub protocol is listed on; Aave is listed through its versions, like on DefiLlama
+STUB_LISTING = [
+    {"name": "Aave V3", "slug": "aave-v3", "parentProtocol": "parent#aave", "tvl": 2.5e10,
+     "chains": ['Ethereum', 'Polygon', 'Arbitrum', 'OP Mainnet', 'Base', 'Avalanche', 'BSC']},
+    {"name": "Aave V2", "slug": "aave-v2", "parentProtocol": "parent#aave", "tvl": 5e8,
+     "chains": ['Ethereum', 'Polygon', 'Avalanche']},
+    {"name": "Drift Trade", "slug": "drift", "tvl": 9e8, "chains": ['Solana']},
+    {"name": "Fluid", "slug": "fluid", "tvl": 4e9, "chains": ['Ethereum', 'Arbitrum', 'Base', 'Polygon', 'Solana']},
+    {"name": "Aerodrome Slipstream", "slug": "aerodrome", "tvl": 1e9, "chains": ['Base']},
+    {"name": "Ethena USDe", "slug": "ethena", "tvl": 6e9, "chains": ['Ethereum']},
+    {"name": "Lido", "slug": "lido", "tvl": 3e10, "chains": ['Ethereum', 'Solana']},
+    {"name": "PancakeSwap AMM", "slug": "pancakeswap-amm", "tvl": 1.5e9, "chains": ['BSC', 'Ethereum', 'Base']},
+]
+
+
+def protocols_payload(listing=STUB_LISTING):
+    """Shape of /protocols: one entry per protocol with its chains and current TVL."""
+    return [dict(entry) for entry in listing]
@@ -0,0 +1,118 @@
+"""Local stand-in for the DefiLlama API used by the benchmarks.
+
+Every request sleeps for a configurable latency before answering with a
+synthetic payload, so fetch strategies can be compared without the network.
+Responses carry an ETag and honour If-None-Match with a 304. Faults can be
+injected per request to exercise retries and the circuit breaker.
+"""
+import collections
+import hashlib
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from payloads import breakdown_payload, protocol_payload, protocols_payload
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients that timed out and hung up are expected; skip their broken-pipe tracebacks
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class StubServer:
+    """Threaded HTTP server serving DefiLlama-shaped JSON on localhost.
+
+    ``latency`` is either a number of seconds or a callable taking the request
+    path and returning one. ``faults``, if given, is called with the path and
+    the number of earlier requests for it, and returns None to answer
+    normally, an error status, or a ``(status, retry_after)`` pair.
+    """
+
+    def __init__(self, latency=0.1, days=365, faults=None):
+        self.latency = latency
+        self.faults = faults
+        self.requests_served = 0
+        self.not_modified = 0
+        self.faults_injected = 0
+        self.attempts = collections.Counter()
+        self._lock = threading.Lock()
+        bodies = {
+            "protocol": json.dumps(protocol_payload(days)).encode(),
+            "summary": json.dumps(breakdown_payload(days)).encode(),
+            "protocols": json.dumps(protocols_payload()).encode(),
+        }
+        etags = {kind: '"%s"' % hashlib.md5(body).hexdigest() for kind, body in bodies.items()}
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                path = urlsplit(self.path).path
+                delay = stub.latency(path) if callable(stub.latency) else stub.latency
+                time.sleep(delay)
+                with stub._lock:
+                    attempt = stub.attempts[path]
+                    stub.attempts[path] += 1
+                fault = stub.faults(path, attempt) if stub.faults else None
+                if fault is not None:
+                    status, retry_after = fault if isinstance(fault, tuple) else (fault, None)
+                    with stub._lock:
+                        stub.requests_served += 1
+                        stub.faults_injected += 1
+                    self.send_response(status)
+                    if retry_after is not None:
+                        self.send_header("Retry-After", str(retry_after))
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                if path == "/protocols":
+                    kind = "protocols"
+                elif path.startswith("/protocol/"):
+                    kind = "protocol"
+                else:
+                    kind = "summary"
+                body = bodies[kind]
+                etag = etags[kind]
+                with stub._lock:
+                    stub.requests_served += 1
+                    if self.headers.get("If-None-Match") == etag:
+                        stub.not_modified += 1
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = _Server(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
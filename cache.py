@@ -0,0 +1,196 @@
+import hashlib
+import json
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlsplit
+
+
+class CacheEntry:
+    """A cached, already decoded payload plus the validators needed to revalidate it."""
+
+    def __init__(self, payload, etag=None, last_modified=None, fetched_at=0.0):
+        self.payload = payload
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at
+
+    def age(self):
+        return time.time() - self.fetched_at
+
+
+class DiskCache:
+    """Size-bounded on-disk cache of decoded HTTP JSON payloads keyed by URL.
+
+    Each URL is stored as two files named after the SHA-256 of the URL: the
+    payload (``.pkl``) and a small JSON sidecar (``.meta``) holding the ETag,
+    Last-Modified and fetch time. Payloads are pickled rather than kept as
+    response text because unpickling is several times faster than re-parsing
+    the JSON, so the directory must only ever be writable by this app. Files
+    are written through a temp file and ``os.replace`` so several worker
+    processes can share one directory.
+
+    ``ttls`` maps URL path prefixes to freshness lifetimes in seconds; the
+    longest matching prefix wins and ``default_ttl`` applies otherwise. Once
+    the directory exceeds ``max_bytes`` the least recently used entries (by
+    payload mtime, which is bumped on every read) are evicted.
+    """
+
+    def __init__(self, directory, max_bytes=256 * 1024 * 1024, ttls=None, default_ttl=3600):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttls = dict(ttls or {})
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode()).hexdigest()
+        base = os.path.join(self.directory, key)
+        return base + ".pkl", base + ".meta"
+
+    def ttl_for(self, url):
+        path = urlsplit(url).path
+        matches = [prefix for prefix in self.ttls if path.startswith(prefix)]
+        if not matches:
+            return self.default_ttl
+        return self.ttls[max(matches, key=len)]
+
+    def is_fresh(self, url, entry):
+        return entry.age() < self.ttl_for(url)
+
+    def get(self, url):
+        payload_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            with open(payload_path, "rb") as f:
+                payload = pickle.load(f)
+        except (OSError, ValueError, pickle.UnpicklingError, EOFError):
+            return None
+        self._touch(payload_path)
+        return CacheEntry(payload, meta.get("etag"), meta.get("last_modified"), meta.get("fetched_at", 0.0))
+
+    def put(self, url, payload, etag=None, last_modified=None):
+        payload_path, meta_path = self._paths(url)
+        meta = {"url": url, "etag": etag, "last_modified": last_modified, "fetched_at": time.time()}
+        self._write(payload_path, pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL))
+        self._write(meta_path, json.dumps(meta).encode())
+        self.evict()
+
+    def revalidated(self, url):
+        """Record a 304 response: the cached payload is fresh again."""
+        payload_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return
+        meta["fetched_at"] = time.time()
+        self._write(meta_path, json.dumps(meta).encode())
+        self._touch(payload_path)
+
+    def evict(self):
+        """Drop least recently used entries until the cache fits in ``max_bytes``."""
+        with self._lock:
+            payloads = []
+            total = 0
+            for name in os.listdir(self.directory):
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                total += stat.st_size
+                if name.endswith(".pkl"):
+                    payloads.append((stat.st_mtime, stat.st_size, path))
+
+            for _, size, payload_path in sorted(payloads):
+                if total <= self.max_bytes:
+                    break
+                meta_path = payload_path[:-len(".pkl")] + ".meta"
+                for path in (payload_path, meta_path):
+                    try:
+                        total -= os.stat(path).st_size
+                        os.remove(path)
+                    except OSError:
+                        pass
+
+    def _write(self, path, content):
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+    def _touch(self, path):
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+
+class LRUCache:
+    """Bounded, thread-safe in-memory LRU cache with hit/miss counters.
+
+    ``generation`` tags what the cached values were computed from (e.g. a
+    dataset version); ``clear(generation)`` drops everything and moves on to
+    the new one. Entries older than ``ttl`` seconds, if given, count as misses.
+    """
+
+    def __init__(self, maxsize=128, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.generation = None
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (self.ttl is None or time.monotonic() - entry[1] < self.ttl):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def peek(self, key):
+        """The cached value or None, without counting a hit or miss or refreshing its recency."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (self.ttl is None or time.monotonic() - entry[1] < self.ttl):
+                return entry[0]
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def values(self):
+        """Snapshot of the cached values, including expired ones not yet evicted."""
+        with self._lock:
+            return [value for value, _ in self._entries.values()]
+
+    def clear(self, generation=None):
+        with self._lock:
+            self._entries.clear()
+            self.generation = generation
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "generation": self.generation,
+            }
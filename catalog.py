@@ -0,0 +1,79 @@
+"""Protocol catalog: the protocols the dashboard covers and the chains each one is deployed on."""
+
+
+class Catalog:
+    """Protocols by display name, with their DefiLlama slug and chains.
+
+    ``slugs`` maps name -> slug and ``chains`` maps name -> the chains that
+    protocol is deployed on, so only those chains are parsed and kept.
+    """
+
+    def __init__(self, slugs, chains):
+        self.slugs = dict(slugs)
+        self.chains = {name: list(chains[name]) for name in self.slugs}
+
+    @classmethod
+    def uniform(cls, slugs, chains):
+        """Every protocol in ``slugs`` on every chain in ``chains``."""
+        return cls(slugs, {name: chains for name in slugs})
+
+    @classmethod
+    def from_listing(cls, listing, slugs=(), top_n=0, chains=None, names=None):
+        """Build a catalog from the ``/protocols`` listing.
+
+        Covers the protocols in ``slugs`` plus the ``top_n`` largest by TVL.
+        Versioned entries (e.g. Aave V2/V3) also count towards their parent
+        protocol, which the listing only references. ``chains``, if given,
+        restricts and orders each protocol's chains; ``names`` maps slugs to
+        display names for entries the listing does not name.
+        """
+        names = dict(names or {})
+        entries = {}
+        children = set()
+        for protocol in listing:
+            slug = protocol.get("slug")
+            if not slug:
+                continue
+            keys = [(slug, protocol.get("name"))]
+            parent = protocol.get("parentProtocol") or ""
+            if parent.startswith("parent#"):
+                keys.append((parent[len("parent#"):], None))
+                children.add(slug)
+            for key, name in keys:
+                entry = entries.setdefault(key, {"name": None, "tvl": 0.0, "chains": set()})
+                entry["name"] = entry["name"] or name
+                entry["tvl"] += protocol.get("tvl") or 0.0
+                entry["chains"].update(protocol.get("chains") or [])
+
+        largest = sorted((slug for slug in entries if slug not in children), key=lambda s: -entries[s]["tvl"])
+        selected = {}
+        for slug in dict.fromkeys([*slugs, *largest[:top_n]]):
+            entry = entries.get(slug)
+            if entry is None:
+                print(f"Protocol {slug} is not in the protocol list")
+                continue
+            if chains is None:
+                protocol_chains = sorted(entry["chains"])
+            else:
+                protocol_chains = [chain for chain in chains if chain in entry["chains"]]
+            if not protocol_chains:
+                continue
+            name = names.get(slug) or entry["name"] or slug.replace("-", " ").title()
+            selected[name] = (slug, protocol_chains)
+        return cls(
+            {name: slug for name, (slug, _) in selected.items()},
+            {name: protocol_chains for name, (_, protocol_chains) in selected.items()},
+        )
+
+    @property
+    def all_chains(self):
+        """Every chain of any covered protocol, sorted."""
+        return sorted({chain for chains in self.chains.values() for chain in chains})
+
+    def subset(self, names):
+        """Catalog of only the protocols in ``names`` that this one covers."""
+        slugs = {name: self.slugs[name] for name in names if name in self.slugs}
+        return Catalog(slugs, self.chains)
+
+    def __len__(self):
+        return len(self.slugs)
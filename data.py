@@ -1,9 +1,20 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import pandas as pd
 import requests
 import numpy as np
 from datetime import datetime, timedelta,date
 
-# Slug mapping: protocol name -> DefiLlama slug
+from cache import DiskCache
+from catalog import Catalog
+from http_client import HttpClient
+
+# Storage dtype of metric columns; "float32" halves their memory (~7 significant digits)
+METRIC_DTYPE = os.environ.get("METRIC_DTYPE", "float64")
+
+# Built-in protocols (name -> DefiLlama slug) and chains, used when the protocol list is unavailable
 PROTOCOL_SLUGS = {
     'Aave': 'aave',
     'Drift': 'drift',
@@ -14,205 +25,422 @@ PROTOCOL_SLUGS = {
 
 CHAINS_OF_INTEREST = ['Ethereum', 'Polygon', 'Arbitrum', 'OP Mainnet', 'Base','Solana']
 
+DEFAULT_CATALOG = Catalog.uniform(PROTOCOL_SLUGS, CHAINS_OF_INTEREST)
+
+# Protocols to cover, as comma-separated DefiLlama slugs (default: the built-in ones)
+CATALOG_PROTOCOLS = [
+    slug.strip() for slug in os.environ.get("CATALOG_PROTOCOLS", ",".join(PROTOCOL_SLUGS.values())).split(",")
+    if slug.strip()
+]
+# Also cover the N protocols with the highest TVL
+CATALOG_TOP_N = int(os.environ.get("CATALOG_TOP_N", "0"))
+# Chains to cover, comma-separated; empty covers every chain a protocol is on
+CATALOG_CHAINS = [
+    chain.strip() for chain in os.environ.get("CATALOG_CHAINS", ",".join(CHAINS_OF_INTEREST)).split(",")
+    if chain.strip()
+]
+# JSON file shaped like the /protocols listing, read instead of the endpoint (e.g. for tests)
+CATALOG_FIXTURE = os.environ.get("CATALOG_FIXTURE")
+
+# DefiLlama API root (overridable so benchmarks can point at a local stub server)
+API_BASE_URL = os.environ.get("DEFILLAMA_API_URL", "https://api.llama.fi")
+
+# Maximum number of endpoint x slug requests in flight at once
+FETCH_CONCURRENCY = int(os.environ.get("FETCH_CONCURRENCY", "20"))
+
+# On-disk cache of raw API responses, shared by restarts and all workers
+CACHE_DIR = os.environ.get("DEFILLAMA_CACHE_DIR", os.path.join(".cache", "defillama"))
+CACHE_MAX_BYTES = int(os.environ.get("DEFILLAMA_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# Freshness per endpoint (seconds): the protocol list changes rarely, TVL moves intraday,
+# fee/volume summaries are daily
+CACHE_TTLS = {
+    "/protocols": 24 * 60 * 60,
+    "/protocol/": 60 * 60,
+    "/summary/fees/": 6 * 60 * 60,
+    "/summary/dexs/": 6 * 60 * 60,
+}
+
+# Offline mode serves whatever is cached, however old, and never touches the network
+OFFLINE = os.environ.get("DEFILLAMA_OFFLINE", "").lower() in ("1", "true", "yes")
+
+response_cache = DiskCache(CACHE_DIR, max_bytes=CACHE_MAX_BYTES, ttls=CACHE_TTLS)
+
+# Per-attempt (connect, read) timeouts in seconds, so a stalled endpoint cannot hang startup
+HTTP_CONNECT_TIMEOUT = float(os.environ.get("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.environ.get("HTTP_READ_TIMEOUT", "30"))
+# Retries of timeouts, connection errors, 429 and 5xx with exponential backoff (or Retry-After)
+HTTP_RETRIES = int(os.environ.get("HTTP_RETRIES", "3"))
+# Requests per second to one host once a burst of FETCH_CONCURRENCY is spent (0 disables)
+HTTP_RATE_LIMIT = float(os.environ.get("HTTP_RATE_LIMIT", "10"))
+# Consecutive failed requests that open a host's circuit, and seconds before it is tried again
+HTTP_BREAKER_THRESHOLD = int(os.environ.get("HTTP_BREAKER_THRESHOLD", "5"))
+HTTP_BREAKER_COOLDOWN = float(os.environ.get("HTTP_BREAKER_COOLDOWN", "60"))
+
+http_client = HttpClient(
+    pool_size=FETCH_CONCURRENCY,
+    timeout=(HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT),
+    retries=HTTP_RETRIES,
+    rate_limit=HTTP_RATE_LIMIT or None,
+    burst=FETCH_CONCURRENCY,
+    breaker_threshold=HTTP_BREAKER_THRESHOLD,
+    breaker_cooldown=HTTP_BREAKER_COOLDOWN,
+)
+
 def generate_date_range(days=180):
     end_date = date.today()
     start_date = end_date - timedelta(days=days)
     return pd.date_range(start=start_date, end=end_date, freq='D')
 
-def fetch_protocol_tvl(slug):
-    url = f"https://api.llama.fi/protocol/{slug}"
-    response = requests.get(url)
-    if response.ok:
-        return response.json()
-    else:
-        print(f"Failed to fetch TVL for {slug}")
+def _fetch_json(url, label, slug):
+    cached = response_cache.get(url)
+    if cached is not None and (OFFLINE or response_cache.is_fresh(url, cached)):
+        return cached.payload
+    if OFFLINE:
+        print(f"No cached {label} for {slug} (offline mode)")
         return None
 
-def fetch_protocol_fees(slug):
-    url = f"https://api.llama.fi/summary/fees/{slug}?dataType=dailyFees"
-    response = requests.get(url)
-    if response.ok:
-        return response.json()
-    else:
-        print(f"Failed to fetch fees for {slug}")
+    # Revalidate stale entries instead of downloading the full history again
+    headers = {}
+    if cached is not None:
+        if cached.etag:
+            headers["If-None-Match"] = cached.etag
+        if cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
+
+    try:
+        # Retries transient failures; raises CircuitOpenError at once while the API is down
+        response = http_client.get(url, headers=headers)
+    except requests.RequestException as e:
+        if cached is not None:
+            print(f"Failed to fetch {label} for {slug}, serving cached copy: {e}")
+            return cached.payload
+        print(f"Failed to fetch {label} for {slug}: {e}")
         return None
 
-def fetch_protocol_revenue(slug):
-    url = f"https://api.llama.fi/summary/fees/{slug}?dataType=dailyRevenue"
-    response = requests.get(url)
+    if response.status_code == 304 and cached is not None:
+        response_cache.revalidated(url)
+        return cached.payload
     if response.ok:
-        return response.json()
+        payload = response.json()
+        response_cache.put(
+            url,
+            payload,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+        return payload
+    elif cached is not None:
+        print(f"Failed to fetch {label} for {slug}, serving cached copy")
+        return cached.payload
     else:
-        print(f"Failed to fetch fees for {slug}")
+        print(f"Failed to fetch {label} for {slug}")
         return None
+
+def fetch_protocol_tvl(slug):
+    url = f"{API_BASE_URL}/protocol/{slug}"
+    return _fetch_json(url, "TVL", slug)
+
+def fetch_protocol_fees(slug):
+    url = f"{API_BASE_URL}/summary/fees/{slug}?dataType=dailyFees"
+    return _fetch_json(url, "fees", slug)
+
+def fetch_protocol_revenue(slug):
+    url = f"{API_BASE_URL}/summary/fees/{slug}?dataType=dailyRevenue"
+    return _fetch_json(url, "revenue", slug)
     
 def fetch_protocol_volume(slug):
-    url = f"https://api.llama.fi/summary/dexs/{slug}?excludeTotalDataChart=true&excludeTotalDataChartBreakdown=false&dataType=dailyVolume"
-    response = requests.get(url)
-    if response.ok:
-        return response.json()
+    url = f"{API_BASE_URL}/summary/dexs/{slug}?excludeTotalDataChart=true&excludeTotalDataChartBreakdown=false&dataType=dailyVolume"
+    return _fetch_json(url, "volume", slug)
+
+def fetch_protocol_list():
+    return _fetch_json(f"{API_BASE_URL}/protocols", "protocol list", "catalog")
+
+def load_catalog():
+    """Catalog of the covered protocols and the chains each one is on.
+
+    Read from CATALOG_FIXTURE if set, otherwise from the ``/protocols``
+    listing, which the response cache keeps for a day. Falls back to
+    DEFAULT_CATALOG when neither is available.
+    """
+    if CATALOG_FIXTURE:
+        with open(CATALOG_FIXTURE) as f:
+            listing = json.load(f)
     else:
-        print(f"Failed to fetch volume for {slug}")
-        return None
+        listing = fetch_protocol_list()
+    if listing:
+        names = {slug: name for name, slug in PROTOCOL_SLUGS.items()}
+        catalog = Catalog.from_listing(listing, CATALOG_PROTOCOLS, CATALOG_TOP_N, CATALOG_CHAINS or None, names)
+        if len(catalog):
+            return catalog
+    print("Protocol list unavailable, using the built-in protocols and chains")
+    return DEFAULT_CATALOG
+
+# Endpoint name -> fetch function, in the order the merge pipeline consumes them
+FETCHERS = {
+    "tvl": fetch_protocol_tvl,
+    "fees": fetch_protocol_fees,
+    "revenue": fetch_protocol_revenue,
+    "volume": fetch_protocol_volume,
+}
+
+def fetch_all_protocols(slugs, max_workers=None):
+    """Fetch every endpoint for every slug concurrently.
+
+    Returns a dict of slug -> {endpoint name -> payload or None}. With
+    ``max_workers=1`` the requests run one after another, which is what the
+    fetch benchmark uses as its baseline.
+    """
+    max_workers = max_workers or FETCH_CONCURRENCY
+    results = {slug: dict.fromkeys(FETCHERS) for slug in slugs}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(fetch, slug): (slug, name)
+            for slug in slugs
+            for name, fetch in FETCHERS.items()
+        }
+        for future in as_completed(futures):
+            slug, name = futures[future]
+            results[slug][name] = future.result()
+
+    return results
        
     
-def tvl_to_df(tvl_data, chain):
+def _entries_after(entries, since, timestamp_of):
+    """Tail of a date-ascending list holding only entries newer than ``since`` (epoch seconds)."""
+    if since is None:
+        return entries
+    start = len(entries)
+    while start > 0 and timestamp_of(entries[start - 1]) > since:
+        start -= 1
+    return entries[start:]
+
+def tvl_to_long(tvl_data, chains=None, since=None):
+    """TVL of every chain in ``chains`` as a long frame, like ``breakdown_to_long``."""
+    chains = CHAINS_OF_INTEREST if chains is None else chains
+
+    timestamps = []
+    chain_codes = []
+    values = []
     try:
-        tvl_series = tvl_data.get("chainTvls", {}).get(chain, {}).get("tvl", [])
-        return pd.DataFrame({
-            "date": pd.to_datetime([e["date"] for e in tvl_series], unit='s'),  # datetime64[ns]
-            "tvl": [e.get("totalLiquidityUSD", np.nan) for e in tvl_series]
-        })
+        chain_tvls = tvl_data.get("chainTvls", {}) if tvl_data else {}
+        for code, chain in enumerate(chains):
+            tvl_series = chain_tvls.get(chain, {}).get("tvl", [])
+            tvl_series = _entries_after(tvl_series, since, lambda e: e["date"])
+            timestamps.extend(e["date"] for e in tvl_series)
+            chain_codes.extend([code] * len(tvl_series))
+            values.extend(e.get("totalLiquidityUSD", np.nan) for e in tvl_series)
     except Exception as e:
-        print(f"Error in tvl_to_df: {e}")
-        return pd.DataFrame()
-
-
-
-
-def fees_to_df(fees_data, chain):
+        print(f"Error in tvl_to_long: {e}")
+        timestamps, chain_codes, values = [], [], []
+
+    return pd.DataFrame({
+        "date": pd.to_datetime(np.asarray(timestamps, dtype="int64"), unit="s"),
+        "chain": pd.Categorical.from_codes(np.asarray(chain_codes, dtype="int8"), categories=chains),
+        "metric": "tvl",
+        "value": np.asarray(values, dtype="float64"),
+    })
+
+def breakdown_to_long(payload, metric, chains=None, since=None):
+    """Flatten a ``totalDataChartBreakdown`` payload for all chains in one pass.
+
+    Returns a long frame with ``date``, ``chain``, ``metric`` and ``value``
+    columns, one row per day and chain that has data; ``chain`` is a
+    categorical over ``chains``. Each chain's value is the sum of its
+    components (e.g. Fluid Lending + Fluid DEX). With ``since`` (epoch
+    seconds) only the newer days are parsed.
+    """
+    chains = CHAINS_OF_INTEREST if chains is None else chains
+    # Breakdown keys are lower-cased chain names
+    wanted = [(chain.lower(), code) for code, chain in enumerate(chains)]
+
+    timestamps = []
+    chain_codes = []
+    values = []
     try:
-        daily_data = fees_data.get("totalDataChartBreakdown", [])
-        parsed = []
-
-        for entry in daily_data:
-            timestamp, breakdown = entry
-            chain_data = breakdown.get(chain.lower())
-
-            if not chain_data:
-                continue
-
-            # Sum all components (e.g. Fluid Lending, Fluid DEX)
-            total_fees = sum(chain_data.values())
-            parsed.append({
-                "date": pd.to_datetime(timestamp, unit="s"),
-                "fees": total_fees
-            })
-
-        return pd.DataFrame(parsed)
+        daily_data = payload.get("totalDataChartBreakdown", []) if payload else []
+        daily_data = _entries_after(daily_data, since, lambda entry: entry[0])
+        for timestamp, breakdown in daily_data:
+            for key, code in wanted:
+                chain_data = breakdown.get(key)
+                if not chain_data:
+                    continue
+                timestamps.append(timestamp)
+                chain_codes.append(code)
+                values.append(sum(chain_data.values()))
     except Exception as e:
-        print(f"Error in fees_to_df for chain {chain}: {e}")
-        return pd.DataFrame()
-
-
-def revenue_to_df(fees_data, chain):
-    try:
-        daily_data = fees_data.get("totalDataChartBreakdown", [])
-        parsed = []
-
-        for entry in daily_data:
-            timestamp, breakdown = entry
-            chain_data = breakdown.get(chain.lower())
-
-            if not chain_data:
-                continue
+        print(f"Error in breakdown_to_long for {metric}: {e}")
+        timestamps, chain_codes, values = [], [], []
+
+    return pd.DataFrame({
+        "date": pd.to_datetime(np.asarray(timestamps, dtype="int64"), unit="s"),
+        "chain": pd.Categorical.from_codes(np.asarray(chain_codes, dtype="int8"), categories=chains),
+        "metric": metric,
+        "value": np.asarray(values, dtype="float64"),
+    })
+
+PROTOCOL_METRICS = ["tvl", "fees", "revenue", "volume"]
+
+def compact_frame(df, dimensions, date_col="date"):
+    """Compact storage for a (dimensions..., date) x metrics frame.
+
+    Dimension columns become categoricals with sorted categories, so each row
+    holds a small integer code instead of a string and equality filters
+    compare codes. Float metrics are stored as METRIC_DTYPE and rows are
+    sorted by dimensions then date.
+    """
+    columns = {}
+    for column in df.columns:
+        values = df[column]
+        if column in dimensions:
+            values = pd.Categorical(values, categories=sorted(values.dropna().unique()))
+        elif column == date_col:
+            values = values.astype("datetime64[ns]")
+        elif values.dtype.kind == "f":
+            values = values.astype(METRIC_DTYPE)
+        columns[column] = values
+    df = pd.DataFrame(columns, index=df.index)
+    return df.sort_values([*dimensions, date_col], kind="stable", ignore_index=True)
+
+
+def _protocol_long_frame(raw_payloads, catalog, since=None):
+    """Every metric of every protocol on its own chains as one long frame with categorical labels."""
+    protocols = list(catalog.slugs)
+    all_chains = catalog.all_chains
+    parts = []
+    for protocol_code, (protocol, slug) in enumerate(catalog.slugs.items()):
+        payloads = raw_payloads[slug]
+        chains = catalog.chains[protocol]
+        protocol_parts = [
+            tvl_to_long(payloads["tvl"], chains, since=since),
+            breakdown_to_long(payloads["fees"], "fees", chains, since=since),
+            breakdown_to_long(payloads["revenue"], "revenue", chains, since=since),
+            breakdown_to_long(payloads["volume"], "volume", chains, since=since),
+        ]
+        for metric_code, part in enumerate(protocol_parts):
+            part["chain"] = part["chain"].cat.set_categories(all_chains)
+            # Codes rather than repeated strings keep the groupby below on integers
+            part["protocol"] = pd.Categorical.from_codes(np.full(len(part), protocol_code), categories=protocols)
+            part["metric"] = pd.Categorical.from_codes(np.full(len(part), metric_code), categories=PROTOCOL_METRICS)
+        parts.extend(protocol_parts)
+    if not parts:
+        return pd.DataFrame(columns=["date", "chain", "metric", "value", "protocol"])
+    return pd.concat(parts, ignore_index=True)
+
+def _protocol_grid(catalog, date_range):
+    """(protocol, chain, date) index over each protocol's own chains and every date."""
+    protocols = list(catalog.slugs)
+    all_chains = catalog.all_chains
+    chain_codes = {chain: code for code, chain in enumerate(all_chains)}
+    pairs = np.array(
+        [(code, chain_codes[chain]) for code, protocol in enumerate(protocols) for chain in catalog.chains[protocol]],
+        dtype=np.int64,
+    ).reshape(-1, 2)
+    n_dates = len(date_range)
+    return pd.MultiIndex(
+        levels=[protocols, all_chains, date_range],
+        codes=[
+            np.repeat(pairs[:, 0], n_dates),
+            np.repeat(pairs[:, 1], n_dates),
+            np.tile(np.arange(n_dates), len(pairs)),
+        ],
+        names=["protocol", "chain", "date"],
+    )
+
+def _assemble_protocol_data(raw_payloads, date_range, since=None, catalog=None):
+    """Wide (protocol, chain, date) x metric frame on the full date grid.
+
+    The long frame is pivoted once and reindexed onto every protocol x chain
+    x date in ``date_range``, covering only the chains each protocol is on,
+    then forward-filled within each protocol/chain. Flow metrics sum their
+    components per day; TVL keeps the day's last reading.
+    """
+    catalog = DEFAULT_CATALOG if catalog is None else catalog
+    long_df = _protocol_long_frame(raw_payloads, catalog, since)
+    keys = ["protocol", "chain", "date", "metric"]
+    tvl_rows = long_df["metric"] == "tvl"
+    long_df = long_df[~tvl_rows | ~long_df.duplicated(keys, keep="last")]
+
+    grid = _protocol_grid(catalog, date_range)
+    if long_df.empty:
+        wide = pd.DataFrame(np.nan, index=grid, columns=PROTOCOL_METRICS)
+    else:
+        wide = (
+            long_df.groupby(keys, observed=True, sort=False)["value"].sum(min_count=1)
+            .unstack("metric")
+            .reindex(index=grid, columns=PROTOCOL_METRICS)
+        )
+
+    # Fill missing values
+    wide = wide.groupby(level=["protocol", "chain"], sort=False).ffill()
+
+    df = wide.reset_index()[["date", *PROTOCOL_METRICS, "protocol", "chain"]]
+    df["expenses"] = df["fees"] - df["revenue"]  # optional placeholder
+    return df
+
+def generate_protocol_data(days=180, max_workers=None, protocols=None, catalog=None):
+    """Protocol frame for ``protocols`` (names in ``catalog``; all by default)."""
+    catalog = DEFAULT_CATALOG if catalog is None else catalog
+    if protocols is not None:
+        catalog = catalog.subset(protocols)
+    date_range = generate_date_range(days)
 
-            # Sum all components (e.g. Fluid Lending, Fluid DEX)
-            total_revenue = sum(chain_data.values())
-            parsed.append({
-                "date": pd.to_datetime(timestamp, unit="s"),
-                "revenue": total_revenue
-            })
+    # Fire all endpoint x slug requests up front instead of one at a time
+    raw_payloads = fetch_all_protocols(catalog.slugs.values(), max_workers=max_workers)
 
-        return pd.DataFrame(parsed)
-    except Exception as e:
-        print(f"Error in fees_to_df for chain {chain}: {e}")
-        return pd.DataFrame()
+    return compact_frame(
+        _assemble_protocol_data(raw_payloads, date_range, catalog=catalog), ["protocol", "chain"]
+    )
 
-def volume_to_df(volume_data, chain):
-    try:
-        daily_data = volume_data.get("totalDataChartBreakdown", [])
-        parsed = []
+def load_protocol(protocol, days=180, catalog=None):
+    """Fetch and parse a single protocol, for loading protocols on demand."""
+    return generate_protocol_data(days, protocols=[protocol], catalog=catalog)
 
-        for entry in daily_data:
-            timestamp, breakdown = entry
-            chain_data = breakdown.get(chain.lower())
+def update_protocol_data(protocol_df, days=180, max_workers=None, catalog=None):
+    """Extend ``protocol_df`` with the days newer than its latest date.
 
-            if not chain_data:
-                continue
+    Only payload entries after each protocol/chain's latest date are parsed,
+    values are forward-filled from the last known row, and days older than
+    the ``days`` window are dropped so the frame does not grow over time.
+    Returns ``protocol_df`` itself when there is nothing new.
+    """
+    catalog = DEFAULT_CATALOG if catalog is None else catalog
+    if protocol_df.empty:
+        return generate_protocol_data(days, max_workers, catalog=catalog)
 
-            # Sum all components (e.g. Fluid Lending, Fluid DEX)
-            total_volume = sum(chain_data.values())
-            parsed.append({
-                "date": pd.to_datetime(timestamp, unit="s"),
-                "volume": total_volume
-            })
+    date_range = generate_date_range(days)
+    latest = protocol_df.groupby(["protocol", "chain"], observed=True)["date"].max()
+    since = latest.min()
+    new_dates = date_range[date_range > since]
+    if len(new_dates) == 0:
+        return protocol_df
 
-        return pd.DataFrame(parsed)
-    except Exception as e:
-        print(f"Error in fees_to_df for chain {chain}: {e}")
-        return pd.DataFrame()
+    # The cache revalidates unchanged payloads, so this is mostly 304s
+    raw_payloads = fetch_all_protocols(catalog.slugs.values(), max_workers=max_workers)
+    new_rows = _assemble_protocol_data(raw_payloads, new_dates, since=int(since.timestamp()), catalog=catalog)
+    if new_rows.empty:
+        return protocol_df
 
-def generate_protocol_data(days=180):
-    date_range = generate_date_range(days)
-    base_df = pd.DataFrame({"date": date_range})
-
-    all_data = []
-
-    for protocol_name, slug in PROTOCOL_SLUGS.items():
-        tvl_raw = fetch_protocol_tvl(slug)
-        fees_raw = fetch_protocol_fees(slug)
-        revenue_raw = fetch_protocol_revenue(slug)
-        volume_raw = fetch_protocol_volume(slug)
-
-        for chain in CHAINS_OF_INTEREST:
-            df = base_df.copy()
-            tvl_df = tvl_to_df(tvl_raw, chain)
-            if not tvl_df.empty:
-                df = df.merge(tvl_df, on="date", how="left")
-            else:
-                df['tvl'] = np.nan
-            
-            fees_df = fees_to_df(fees_raw, chain) if fees_raw else pd.DataFrame()
-            if not fees_df.empty:
-                df = df.merge(fees_df, on="date", how="left")
-            else:
-                df['fees'] = np.nan
-            
-            revenue_df = revenue_to_df(revenue_raw, chain) if revenue_raw else pd.DataFrame()
-            if not revenue_df.empty:
-                df = df.merge(revenue_df, on="date", how="left")
-            else:
-                df['revenue'] = np.nan
-                
-            volume_df = volume_to_df(revenue_raw, chain) if volume_raw else pd.DataFrame()
-            if not volume_df.empty:
-                df = df.merge(volume_df, on="date", how="left")
-            else:
-                df['volume'] = np.nan
-
-            # Fill missing values
-            df[["tvl","fees","revenue","volume"]] = df[["tvl","fees","revenue","volume"]].ffill()
-
-            # Add identifiers
-            df["protocol"] = protocol_name
-            df["chain"] = chain
-            df["expenses"] = df["fees"] - df["revenue"]  # optional placeholder
-
-            all_data.append(df)
-
-    if all_data:
-        return pd.concat(all_data, ignore_index=True)
-    else:
-        return pd.DataFrame()
+    # Drop rows each protocol/chain already has, then forward fill from its last row
+    new_rows = new_rows.merge(latest.rename("latest").reset_index(), on=["protocol", "chain"], how="left")
+    new_rows = new_rows[new_rows["latest"].isna() | (new_rows["date"] > new_rows["latest"])]
+    new_rows = new_rows.drop(columns="latest")
 
+    seed = protocol_df[protocol_df["date"] == protocol_df.groupby(["protocol", "chain"], observed=True)["date"].transform("max")]
+    combined = pd.concat([seed, new_rows], ignore_index=True).sort_values(["protocol", "chain", "date"], kind="stable")
+    combined[PROTOCOL_METRICS] = combined.groupby(["protocol", "chain"], observed=True)[PROTOCOL_METRICS].ffill()
+    combined["expenses"] = combined["fees"] - combined["revenue"]
+    # Seed rows kept their 0..len(seed)-1 labels through ignore_index
+    new_rows = combined[combined.index >= len(seed)]
 
+    # Keep each protocol/chain's rows contiguous and date-ordered for the query index
+    kept = protocol_df[protocol_df["date"] >= date_range[0]]
+    updated = pd.concat([kept, new_rows[protocol_df.columns]], ignore_index=True)
+    return compact_frame(updated, ["protocol", "chain"])
 
-# Get metrics for the cards
-def get_current_metrics():
-    protocol_df = generate_protocol_data()
-    latest_date = protocol_df['date'].max()
 
-    latest_data = protocol_df[protocol_df['date'] == latest_date]
 
-    return {
-        'total_tvl': latest_data['tvl'].sum(),
-        'total_fees': latest_data['fees'].sum(),
-        'total_revenue': latest_data['revenue'].sum(),
-        'total_volume': latest_data['volume'].sum(),
-        'active_chains': len(latest_data['chain']),
-        'active_protocols': len(latest_data['protocol'].unique())
-    } 
     
     
     
@@ -305,128 +533,178 @@ def get_current_metrics():
     
     
 # Pool-Level Data (Type 2)
-def generate_pool_data():
-    pools = [
-        {'protocol': 'Uniswap', 'name': 'ETH-USDC', 'version': 'v3'},
-        {'protocol': 'Uniswap', 'name': 'ETH-USDT', 'version': 'v3'},
-        {'protocol': 'Uniswap', 'name': 'BTC-ETH', 'version': 'v3'},
-        {'protocol': 'Uniswap', 'name': 'ETH-DAI', 'version': 'v2'},
-        {'protocol': 'Aave', 'name': 'ETH Supply', 'version': 'v3'},
-        {'protocol': 'Aave', 'name': 'USDC Supply', 'version': 'v3'},
-        {'protocol': 'Aave', 'name': 'DAI Borrow', 'version': 'v2'},
-        {'protocol': 'Compound', 'name': 'ETH Supply', 'version': 'v3'},
-        {'protocol': 'Compound', 'name': 'USDC Borrow', 'version': 'v3'},
-        {'protocol': 'Curve', 'name': '3pool', 'version': 'v2'},
-        {'protocol': 'Curve', 'name': 'stETH-ETH', 'version': 'v2'},
-        {'protocol': 'dYdX', 'name': 'ETH-USD', 'version': 'v4'},
-    ]
-    
-    chains = ['Ethereum', 'Polygon', 'Arbitrum', 'Optimism', 'Base']
-    date_range = generate_date_range()
-    
-    data = []
-    
-    for pool in pools:
-        # Base values differ by pool
-        base_tvl = np.random.uniform(10000000, 500000000)
-        base_fees = np.random.uniform(5000, 100000)
-        base_volume = np.random.uniform(1000000, 50000000)
-        base_utilization = np.random.uniform(0.3, 0.7) if 'Supply' in pool['name'] or 'Borrow' in pool['name'] else None
-        base_supply_rate = np.random.uniform(0.01, 0.1) if 'Supply' in pool['name'] else None
-        base_borrow_rate = np.random.uniform(0.03, 0.15) if 'Borrow' in pool['name'] else None
-        
-        for date in date_range:
-            # Add time-based trends
-            day_factor = 1 + 0.001 * (date_range.get_loc(date) - len(date_range)/2)
-            day_factor *= np.random.uniform(0.93, 1.07)  # More volatility at pool level
-            
-            # Only include certain chains based on the protocol
-            valid_chains = chains if pool['protocol'] != 'dYdX' else ['Ethereum', 'Base']
-            
-            for chain in valid_chains:
-                # Some pools only exist on certain chains
-                if np.random.random() > 0.6:  # 40% chance to skip this chain for this pool
-                    continue
-                    
-                # Data for this day and chain
-                tvl = base_tvl * day_factor * np.random.uniform(0.8, 1.2)
-                fees = base_fees * day_factor * np.random.uniform(0.7, 1.3)
-                volume = base_volume * day_factor * np.random.uniform(0.5, 1.5)
-                
-                pool_data = {
-                    'date': date,
-                    'protocol': pool['protocol'],
-                    'pool_name': pool['name'],
-                    'version': pool['version'],
-                    'chain': chain,
-                    'tvl': tvl,
-                    'fees': fees,
-                    'volume': volume,
-                }
-                
-                # Add lending-specific metrics for lending protocols
-                if pool['protocol'] in ['Aave', 'Compound']:
-                    utilization = base_utilization * day_factor * np.random.uniform(0.9, 1.1)
-                    utilization = min(max(utilization, 0.1), 0.95)  # Keep between 10% and 95%
-                    
-                    pool_data['utilization_rate'] = utilization
-                    
-                    if 'Supply' in pool['name']:
-                        pool_data['supply_rate'] = base_supply_rate * day_factor * np.random.uniform(0.9, 1.1)
-                    
-                    if 'Borrow' in pool['name']:
-                        pool_data['borrow_rate'] = base_borrow_rate * day_factor * np.random.uniform(0.9, 1.1)
-                
-                data.append(pool_data)
-    
-    return pd.DataFrame(data)
+POOLS = [
+    {'protocol': 'Uniswap', 'name': 'ETH-USDC', 'version': 'v3'},
+    {'protocol': 'Uniswap', 'name': 'ETH-USDT', 'version': 'v3'},
+    {'protocol': 'Uniswap', 'name': 'BTC-ETH', 'version': 'v3'},
+    {'protocol': 'Uniswap', 'name': 'ETH-DAI', 'version': 'v2'},
+    {'protocol': 'Aave', 'name': 'ETH Supply', 'version': 'v3'},
+    {'protocol': 'Aave', 'name': 'USDC Supply', 'version': 'v3'},
+    {'protocol': 'Aave', 'name': 'DAI Borrow', 'version': 'v2'},
+    {'protocol': 'Compound', 'name': 'ETH Supply', 'version': 'v3'},
+    {'protocol': 'Compound', 'name': 'USDC Borrow', 'version': 'v3'},
+    {'protocol': 'Curve', 'name': '3pool', 'version': 'v2'},
+    {'protocol': 'Curve', 'name': 'stETH-ETH', 'version': 'v2'},
+    {'protocol': 'dYdX', 'name': 'ETH-USD', 'version': 'v4'},
+]
+
+POOL_CHAINS = ['Ethereum', 'Polygon', 'Arbitrum', 'Optimism', 'Base']
+
+def _pool_list(n_pools):
+    """The template pools, repeated with numbered names to reach ``n_pools``."""
+    if n_pools is None:
+        return POOLS
+    pools = []
+    for i in range(n_pools):
+        template = POOLS[i % len(POOLS)]
+        copy_number = i // len(POOLS)
+        name = template['name'] if copy_number == 0 else f"{template['name']} #{copy_number + 1}"
+        pools.append({**template, 'name': name})
+    return pools
+
+def generate_pool_data(days=180, n_pools=None, seed=None):
+    """Synthetic daily pool metrics, generated column-wise with one seeded Generator.
+
+    Every random draw for all pools x dates x chains is made in bulk, so
+    thousands of pools over years of history (millions of rows) take
+    seconds. ``n_pools`` beyond the template list reuses the templates
+    with numbered names; ``seed`` makes the output reproducible. Labels are
+    categorical and metrics METRIC_DTYPE, as in ``compact_frame``.
+    """
+    rng = np.random.default_rng(seed)
+    pools = _pool_list(n_pools)
+    date_range = generate_date_range(days)
+    n_pools, n_dates, n_chains = len(pools), len(date_range), len(POOL_CHAINS)
+
+    protocols = np.array([pool['protocol'] for pool in pools], dtype=object)
+    names = np.array([pool['name'] for pool in pools], dtype=object)
+    versions = np.array([pool['version'] for pool in pools], dtype=object)
+    is_supply = np.array(['Supply' in name for name in names])
+    is_borrow = np.array(['Borrow' in name for name in names])
+    is_lending = np.isin(protocols, ['Aave', 'Compound'])
+
+    # Base values differ by pool
+    base_tvl = rng.uniform(10000000, 500000000, n_pools)
+    base_fees = rng.uniform(5000, 100000, n_pools)
+    base_volume = rng.uniform(1000000, 50000000, n_pools)
+    base_utilization = np.where(is_supply | is_borrow, rng.uniform(0.3, 0.7, n_pools), np.nan)
+    base_supply_rate = np.where(is_supply, rng.uniform(0.01, 0.1, n_pools), np.nan)
+    base_borrow_rate = np.where(is_borrow, rng.uniform(0.03, 0.15, n_pools), np.nan)
+
+    # Time-based trend with more volatility at pool level, per pool and day
+    trend = 1 + 0.001 * (np.arange(n_dates) - n_dates / 2)
+    day_factor = trend * rng.uniform(0.93, 1.07, (n_pools, n_dates))
+
+    # dYdX only runs on Ethereum and Base; otherwise each chain has a 60% chance per day
+    valid_chains = np.ones((n_pools, n_chains), dtype=bool)
+    valid_chains[protocols == 'dYdX'] = np.isin(POOL_CHAINS, ['Ethereum', 'Base'])
+    keep = valid_chains[:, None, :] & (rng.random((n_pools, n_dates, n_chains)) <= 0.6)
+
+    # Emit rows grouped by protocol/chain with ascending dates, as the query
+    # index expects: per protocol, walk the keep mask as chain x date x pool
+    chain_order = np.argsort(POOL_CHAINS)
+    parts = []
+    for protocol in np.unique(protocols):
+        members = np.flatnonzero(protocols == protocol)
+        chain_pos, date_pos, member_pos = np.nonzero(keep[members][:, :, chain_order].transpose(2, 1, 0))
+        parts.append((members[member_pos], date_pos, chain_order[chain_pos]))
+    pool_idx, date_idx, chain_idx = (np.concatenate(column) for column in zip(*parts))
+    n_rows = len(pool_idx)
+
+    row_factor = day_factor[pool_idx, date_idx]
+
+    utilization = base_utilization[pool_idx] * row_factor * rng.uniform(0.9, 1.1, n_rows)
+    utilization = np.clip(utilization, 0.1, 0.95)  # Keep between 10% and 95%
+    lending_rows = is_lending[pool_idx]
+
+    def categorical(values, rows):
+        # Per-pool (or per-chain) labels as a categorical column with sorted categories
+        categories, codes = np.unique(values, return_inverse=True)
+        return pd.Categorical.from_codes(codes[rows], categories=categories)
+
+    def metric(values):
+        return np.where(lending_rows, values, np.nan).astype(METRIC_DTYPE)
+
+    df = pd.DataFrame({
+        'date': date_range.values[date_idx],
+        'protocol': categorical(protocols, pool_idx),
+        'pool_name': categorical(names, pool_idx),
+        'version': categorical(versions, pool_idx),
+        'chain': categorical(np.array(POOL_CHAINS, dtype=object), chain_idx),
+        'tvl': (base_tvl[pool_idx] * row_factor * rng.uniform(0.8, 1.2, n_rows)).astype(METRIC_DTYPE),
+        'fees': (base_fees[pool_idx] * row_factor * rng.uniform(0.7, 1.3, n_rows)).astype(METRIC_DTYPE),
+        'volume': (base_volume[pool_idx] * row_factor * rng.uniform(0.5, 1.5, n_rows)).astype(METRIC_DTYPE),
+        # Lending-specific metrics only for lending protocols
+        'utilization_rate': metric(utilization),
+        'supply_rate': metric(base_supply_rate[pool_idx] * row_factor * rng.uniform(0.9, 1.1, n_rows)),
+        'borrow_rate': metric(base_borrow_rate[pool_idx] * row_factor * rng.uniform(0.9, 1.1, n_rows)),
+    })
+
+    return df
 
 # Transaction-Level Data
-def generate_transaction_data(n_transactions=100):
-    protocols = ['Uniswap', 'Aave', 'Compound', 'Curve', 'dYdX']
-    chains = ['Ethereum', 'Polygon', 'Arbitrum', 'Optimism', 'Base']
-    action_types = ['Swap', 'Supply', 'Borrow', 'Repay', 'Withdraw']
-    
-    data = []
-    
-    for i in range(n_transactions):
-        protocol = np.random.choice(protocols)
-        
-        # Determine action type based on protocol
-        if protocol in ['Uniswap', 'Curve']:
-            action = 'Swap'
-        elif protocol in ['Aave', 'Compound']:
-            action = np.random.choice(['Supply', 'Borrow', 'Repay', 'Withdraw'])
-        else:
-            action = np.random.choice(action_types)
-            
+TX_PROTOCOLS = ['Uniswap', 'Aave', 'Compound', 'Curve', 'dYdX']
+TX_CHAINS = ['Ethereum', 'Polygon', 'Arbitrum', 'Optimism', 'Base']
+TX_ACTIONS = ['Swap', 'Supply', 'Borrow', 'Repay', 'Withdraw']
+
+# Amount range (USD) per action, in TX_ACTIONS order
+TX_AMOUNT_LOW = np.array([100, 1000, 1000, 500, 500], dtype=float)
+TX_AMOUNT_HIGH = np.array([50000, 100000, 100000, 20000, 20000], dtype=float)
+
+# Two lowercase hex characters for every byte value
+HEX_PAIRS = np.frombuffer(''.join(f"{i:02x}" for i in range(256)).encode(), dtype=np.uint8).reshape(256, 2)
+
+def random_hex_strings(rng, n, n_bytes):
+    """``n`` random '0x'-prefixed hex strings of ``n_bytes`` bytes, from one random byte buffer."""
+    raw = rng.integers(0, 256, (n, n_bytes), dtype=np.uint8)
+    chars = np.empty((n, 2 + 2 * n_bytes), dtype=np.uint8)
+    chars[:, 0] = ord('0')
+    chars[:, 1] = ord('x')
+    chars[:, 2:] = HEX_PAIRS[raw].reshape(n, 2 * n_bytes)
+    return chars.view(f"S{chars.shape[1]}").ravel().astype(str).astype(object)
+
+def _transaction_chunk(rng, n, now):
+    protocol = rng.integers(0, len(TX_PROTOCOLS), n)
+
+    # Determine action type based on protocol: DEXes only swap, lenders never
+    # swap, and dYdX can do anything
+    action = np.zeros(n, dtype=np.int64)
+    lending = np.isin(protocol, [TX_PROTOCOLS.index('Aave'), TX_PROTOCOLS.index('Compound')])
+    action[lending] = rng.integers(1, len(TX_ACTIONS), lending.sum())
+    dydx = protocol == TX_PROTOCOLS.index('dYdX')
+    action[dydx] = rng.integers(0, len(TX_ACTIONS), dydx.sum())
+
+    low, high = TX_AMOUNT_LOW[action], TX_AMOUNT_HIGH[action]
+
+    return pd.DataFrame({
         # Random transaction time in last 7 days
-        tx_time = datetime.now() - timedelta(days=np.random.uniform(0, 7))
-        
-        # Generate random wallet address
-        wallet = '0x' + ''.join(np.random.choice(list('0123456789abcdef'), 40))
-        
-        # Generate amount based on action type
-        if action == 'Swap':
-            amount = np.random.uniform(100, 50000)
-        elif action in ['Supply', 'Borrow']:
-            amount = np.random.uniform(1000, 100000)
-        else:
-            amount = np.random.uniform(500, 20000)
-            
-        # Generate gas fee
-        gas_fee = np.random.uniform(5, 100)
-        
-        data.append({
-            'timestamp': tx_time,
-            'protocol': protocol,
-            'chain': np.random.choice(chains),
-            'wallet_address': wallet,
-            'action': action,
-            'amount_usd': amount,
-            'gas_fee_usd': gas_fee,
-            'transaction_hash': '0x' + ''.join(np.random.choice(list('0123456789abcdef'), 64))
-        })
-    
-    return pd.DataFrame(data)
-
+        'timestamp': now - pd.to_timedelta(rng.uniform(0, 7, n), unit='D'),
+        'protocol': pd.Categorical.from_codes(protocol, categories=TX_PROTOCOLS),
+        'chain': pd.Categorical.from_codes(rng.integers(0, len(TX_CHAINS), n), categories=TX_CHAINS),
+        'wallet_address': random_hex_strings(rng, n, 20),
+        'action': pd.Categorical.from_codes(action, categories=TX_ACTIONS),
+        'amount_usd': low + (high - low) * rng.random(n),
+        'gas_fee_usd': rng.uniform(5, 100, n),
+        'transaction_hash': random_hex_strings(rng, n, 32),
+    })
+
+def iter_transaction_data(n_transactions, chunk_size=100000, seed=None):
+    """Yield synthetic transactions as DataFrames of at most ``chunk_size`` rows.
+
+    Each chunk is generated in bulk (addresses and hashes come from random
+    byte buffers), so feeds far larger than memory can be produced and
+    consumed chunk by chunk. ``n_transactions=None`` streams forever.
+    Timestamps are relative to the moment the generator starts.
+    """
+    rng = np.random.default_rng(seed)
+    now = pd.Timestamp.now()
+    produced = 0
+    while n_transactions is None or produced < n_transactions:
+        n = chunk_size if n_transactions is None else min(chunk_size, n_transactions - produced)
+        yield _transaction_chunk(rng, n, now)
+        produced += n
+
+def generate_transaction_data(n_transactions=100, seed=None):
+    """Synthetic transactions as one DataFrame; protocol, chain and action are categorical."""
+    rng = np.random.default_rng(seed)
+    return _transaction_chunk(rng, n_transactions, pd.Timestamp.now())
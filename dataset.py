@@ -0,0 +1,344 @@
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+try:
+    import fcntl
+except ImportError:  # Windows: no multi-worker servers, every process publishes
+    fcntl = None
+
+import snapshot
+from cache import LRUCache
+from data import update_protocol_data
+from query import FrameIndex, RollupCube, TimePyramid, TransactionIndex
+
+FRAME_NAMES = ("protocol_data", "pool_data", "transaction_data")
+# Column each frame is sorted by within its (protocol, chain) groups
+FRAME_TIME_COLUMNS = {"protocol_data": "date", "pool_data": "date", "transaction_data": "timestamp"}
+# Metrics that are levels rather than flows: a week or month keeps their last value
+STOCK_METRICS = ("tvl", "utilization_rate", "supply_rate", "borrow_rate")
+
+
+class Dataset:
+    """The frames the dashboard callbacks read, treated as immutable.
+
+    A refresh never mutates a Dataset in place; it builds a new one with a
+    higher ``version`` and swaps it into the DatasetStore. The query indexes,
+    rollups and time pyramids are built here, so that cost lands on the
+    loader or refresher thread rather than on the first click after a swap.
+    """
+
+    def __init__(self, protocol_data, pool_data, transaction_data, version=0,
+                 protocol_index=None, pool_index=None, protocol_rollup=None, pool_rollup=None,
+                 protocol_pyramid=None, pool_pyramid=None, transaction_index=None):
+        self.protocol_index = protocol_index or FrameIndex(protocol_data)
+        self.pool_index = pool_index or FrameIndex(pool_data)
+        # The indexed (sorted) frames are the ones callbacks see
+        self.protocol_data = self.protocol_index.df
+        self.pool_data = self.pool_index.df
+        self.protocol_rollup = protocol_rollup or RollupCube(self.protocol_index)
+        self.pool_rollup = pool_rollup or RollupCube(self.pool_index)
+        self.protocol_pyramid = protocol_pyramid or TimePyramid(self.protocol_rollup, STOCK_METRICS)
+        self.pool_pyramid = pool_pyramid or TimePyramid(self.pool_rollup, STOCK_METRICS)
+        self.transaction_index = transaction_index or TransactionIndex(transaction_data)
+        self.transaction_data = self.transaction_index.df
+        self.version = version
+        self._current_metrics = None
+
+    def index_for(self, data_type):
+        """FrameIndex for the "protocol" or "pool" data type."""
+        return self.protocol_index if data_type == "protocol" else self.pool_index
+
+    def rollup_for(self, data_type):
+        """RollupCube for the "protocol" or "pool" data type."""
+        return self.protocol_rollup if data_type == "protocol" else self.pool_rollup
+
+    def pyramid_for(self, data_type):
+        """TimePyramid for the "protocol" or "pool" data type."""
+        return self.protocol_pyramid if data_type == "protocol" else self.pool_pyramid
+
+    def current_metrics(self):
+        """Headline totals over the latest protocol rows, computed once per version."""
+        if self._current_metrics is None:
+            index = self.protocol_index
+            _, totals, keys = index.latest(list(index.groups), ["tvl", "fees", "revenue", "volume"])
+            self._current_metrics = {
+                "total_tvl": totals["tvl"],
+                "total_fees": totals["fees"],
+                "total_revenue": totals["revenue"],
+                "total_volume": totals["volume"],
+                "active_chains": len(keys),
+                "active_protocols": len({protocol for protocol, _ in keys}),
+            }
+        return self._current_metrics
+
+    def memory_report(self):
+        """Rows and in-memory bytes of each frame, in total and per column."""
+        report = {}
+        for name in FRAME_NAMES:
+            df = getattr(self, name)
+            usage = df.memory_usage(index=False, deep=True)
+            report[name] = {
+                "rows": len(df),
+                "bytes": int(usage.sum()),
+                "columns": {column: int(size) for column, size in usage.items()},
+            }
+        return report
+
+    def replace(self, **frames):
+        """Return a new Dataset with some frames swapped and the version bumped."""
+        fields = {
+            "protocol_data": self.protocol_data,
+            "pool_data": self.pool_data,
+            "transaction_data": self.transaction_data,
+        }
+        fields.update(frames)
+        # Reuse the indexes and rollups of frames that did not change
+        if "protocol_data" not in frames:
+            fields["protocol_index"] = self.protocol_index
+            fields["protocol_rollup"] = self.protocol_rollup
+            fields["protocol_pyramid"] = self.protocol_pyramid
+        if "pool_data" not in frames:
+            fields["pool_index"] = self.pool_index
+            fields["pool_rollup"] = self.pool_rollup
+            fields["pool_pyramid"] = self.pool_pyramid
+        if "transaction_data" not in frames:
+            fields["transaction_index"] = self.transaction_index
+        return Dataset(version=self.version + 1, **fields)
+
+
+class ProtocolEntry:
+    """One lazily loaded protocol frame with its query index, rollup and time pyramid."""
+
+    def __init__(self, protocol_data, version):
+        self.index = FrameIndex(protocol_data)
+        self.rollup = RollupCube(self.index)
+        self.pyramid = TimePyramid(self.rollup, STOCK_METRICS)
+        self.protocol_data = self.index.df
+        self.version = version
+
+
+class LazyProtocolData:
+    """Protocol frames fetched and parsed on first access, one protocol at a time.
+
+    ``loader(protocol)`` returns that protocol's frame. Concurrent requests
+    for a protocol that is still loading wait for the same load instead of
+    starting their own. Loaded entries live in an LRU cache of ``maxsize``
+    protocols and are loaded again after ``ttl`` seconds; each load gets a
+    new ``version`` so caches derived from an entry can tell it changed.
+    """
+
+    def __init__(self, loader, maxsize=32, ttl=None):
+        self.loader = loader
+        self.cache = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.loads = 0
+        self.shared_loads = 0
+        self._loading = {}
+        self._versions = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def get(self, protocol):
+        """The ProtocolEntry for ``protocol``, loading it if needed."""
+        with self._lock:
+            entry = self.cache.get(protocol)
+            if entry is not None:
+                return entry
+            future = self._loading.get(protocol)
+            owner = future is None
+            if owner:
+                future = self._loading[protocol] = Future()
+                self.loads += 1
+            else:
+                self.shared_loads += 1
+        if not owner:
+            return future.result()
+
+        try:
+            entry = ProtocolEntry(self.loader(protocol), next(self._versions))
+            self.cache.put(protocol, entry)
+            future.set_result(entry)
+            return entry
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._loading[protocol]
+
+    def memory_report(self):
+        """Rows and bytes of the protocol frames currently loaded."""
+        frames = [entry.protocol_data for entry in self.cache.values()]
+        return {
+            "rows": sum(len(df) for df in frames),
+            "bytes": sum(int(df.memory_usage(index=False, deep=True).sum()) for df in frames),
+        }
+
+    def stats(self):
+        return {**self.cache.stats(), "loads": self.loads, "shared_loads": self.shared_loads}
+
+
+class DatasetStore:
+    """Holds the current Dataset.
+
+    Callbacks call ``get()`` once per request and use that snapshot
+    throughout, so a concurrent ``swap()`` never mixes two versions within
+    one response.
+    """
+
+    def __init__(self, dataset):
+        self._dataset = dataset
+        self._lock = threading.Lock()
+
+    def get(self):
+        return self._dataset
+
+    def swap(self, dataset):
+        with self._lock:
+            self._dataset = dataset
+
+    def replace(self, current, **frames):
+        """Swap in ``current`` with some frames replaced; return the new Dataset."""
+        dataset = current.replace(**frames)
+        self.swap(dataset)
+        return dataset
+
+    def acquire_publisher(self):
+        """Whether this process may fetch and swap in new data. Always true in-process."""
+        return True
+
+
+class SharedDatasetStore(DatasetStore):
+    """DatasetStore backed by memory-mapped snapshots shared between processes.
+
+    One process (the publisher, elected with an exclusive file lock) fetches
+    data and publishes it to ``directory`` with ``swap()``. Every process,
+    the publisher included, maps the published columns read-only, so N
+    gunicorn workers share one copy of the data and one set of upstream API
+    calls. A daemon thread in each process checks for a newer published
+    version every ``poll_interval`` seconds; ``get()`` never waits on it and
+    keeps returning the previous Dataset until the new one is fully built.
+
+    Only the frames are shared. The query indexes, rollups and time
+    pyramids of a Dataset are derived from them in each worker, on that
+    worker's poller thread, so they cost CPU time and memory per worker.
+    """
+
+    def __init__(self, directory, poll_interval=5.0):
+        super().__init__(None)
+        self.directory = directory
+        self.poll_interval = poll_interval
+        self._lock_file = None
+        self._poller_pid = None
+        os.makedirs(directory, exist_ok=True)
+
+    def acquire_publisher(self):
+        """Try to become the publisher without blocking; once acquired it is held until exit."""
+        if self._lock_file is not None or fcntl is None:
+            return True
+        lock_file = open(os.path.join(self.directory, "publisher.lock"), "w")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    def load_published(self):
+        """Map the current published version; return None if nothing is published yet."""
+        version = snapshot.current_version(self.directory)
+        if version is None:
+            return None
+        frames = snapshot.load_frames(self.directory, version, FRAME_NAMES)
+        dataset = Dataset(version=version, **frames)
+        with self._lock:
+            # A slower concurrent load of an older version must not win
+            if self._dataset is None or dataset.version >= self._dataset.version:
+                self._dataset = dataset
+        return dataset
+
+    def wait_for_published(self, timeout=600, interval=0.5):
+        """Block until the publisher has written a first version."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            dataset = self.load_published()
+            if dataset is not None:
+                return dataset
+            time.sleep(interval)
+        raise TimeoutError(f"No dataset published to {self.directory} after {timeout}s")
+
+    def _poll(self):
+        while True:
+            time.sleep(self.poll_interval)
+            try:
+                version = snapshot.current_version(self.directory)
+                if version is not None and (self._dataset is None or version > self._dataset.version):
+                    self.load_published()
+            except Exception as e:
+                print(f"Loading published dataset failed: {e}")
+
+    def get(self):
+        # Threads do not survive a fork, so each worker starts its own poller
+        if self._poller_pid != os.getpid():
+            self._poller_pid = os.getpid()
+            threading.Thread(target=self._poll, name="snapshot-poller", daemon=True).start()
+        return self._dataset
+
+    def publish(self, frames):
+        """Publish ``frames`` (name -> DataFrame) and return the Dataset mapped from them.
+
+        Frames are sorted into the FrameIndex layout before they are written,
+        so mapping them needs no copy; the indexes, rollups and pyramids are
+        built once, on the mapped frames.
+        """
+        ordered = {
+            name: FrameIndex(df, date_col=FRAME_TIME_COLUMNS[name]).df for name, df in frames.items()
+        }
+        snapshot.publish_frames(self.directory, ordered)
+        return self.load_published()
+
+    def replace(self, current, **frames):
+        return self.publish({**{name: getattr(current, name) for name in FRAME_NAMES}, **frames})
+
+    def swap(self, dataset):
+        self.publish({name: getattr(dataset, name) for name in FRAME_NAMES})
+
+
+class DataRefresher(threading.Thread):
+    """Daemon thread that appends new protocol days every ``interval`` seconds.
+
+    Callbacks keep serving the previous Dataset until the new one is ready,
+    so they never wait on the network.
+    """
+
+    def __init__(self, store, interval, days=180, catalog=None):
+        super().__init__(name="data-refresher", daemon=True)
+        self.store = store
+        self.interval = interval
+        self.days = days
+        self.catalog = catalog
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.refresh_once()
+            except Exception as e:
+                print(f"Background refresh failed: {e}")
+
+    def refresh_once(self):
+        """Fetch and append new days; return True if a new Dataset was swapped in."""
+        # With a shared store only the publisher process talks to the API
+        if not self.store.acquire_publisher():
+            return False
+        current = self.store.get()
+        protocol_data = update_protocol_data(current.protocol_data, days=self.days, catalog=self.catalog)
+        if protocol_data is current.protocol_data:
+            return False
+        self.store.replace(current, protocol_data=protocol_data)
+        return True
+
+    def stop(self):
+        self._stop_event.set()
@@ -0,0 +1,59 @@
+"""Downsampling of line series to a bounded number of points for plotting."""
+import numpy as np
+
+
+def lttb(x, y, n):
+    """Positions of the ``n`` points Largest-Triangle-Three-Buckets keeps.
+
+    The first and last points are always kept. The points in between are
+    split into ``n - 2`` buckets, and from each bucket the point forming the
+    largest triangle with the previously kept point and the next bucket's
+    average is kept, which preserves peaks and the overall shape of the line.
+    """
+    length = len(y)
+    if n >= length or n < 3:
+        return np.arange(length)
+    x = np.asarray(x, dtype=float)
+    y = np.nan_to_num(np.asarray(y, dtype=float))
+    edges = np.linspace(1, length - 1, n - 1).astype(int)
+    kept = np.empty(n, dtype=int)
+    kept[0], kept[-1] = 0, length - 1
+    previous = 0
+    for bucket in range(n - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        # Average of the next bucket (the last point for the final bucket)
+        next_stop = edges[bucket + 2] if bucket + 2 < len(edges) else length
+        next_x = x[stop:next_stop].mean()
+        next_y = y[stop:next_stop].mean()
+        area = np.abs(
+            (x[previous] - next_x) * (y[start:stop] - y[previous])
+            - (x[previous] - x[start:stop]) * (next_y - y[previous])
+        )
+        previous = start + int(np.argmax(area))
+        kept[bucket + 1] = previous
+    return kept
+
+
+def minmax(y, n):
+    """Positions of at most ``n`` points: the first, the last, and each bucket's minimum and maximum.
+
+    Cheaper than LTTB and keeps every spike, at the cost of a jagged line
+    when the series is smooth.
+    """
+    length = len(y)
+    buckets = (n - 2) // 2
+    if n >= length or buckets < 1:
+        return np.arange(length)
+    y = np.nan_to_num(np.asarray(y, dtype=float))
+    starts = np.linspace(0, length, buckets + 1).astype(int)
+    bucket = np.repeat(np.arange(buckets), np.diff(starts))
+    # Sort by value within each bucket: its first and last positions are the min and max
+    order = np.lexsort((y, bucket))
+    return np.unique(np.r_[0, order[starts[:-1]], order[starts[1:] - 1], length - 1])
+
+
+def downsample(x, y, n, method="lttb"):
+    """Positions to plot of the ``x``/``y`` series, at most about ``n`` of them."""
+    if method == "minmax":
+        return minmax(y, n)
+    return lttb(x, y, n)
@@ -0,0 +1,199 @@
+"""Shared HTTP client: pooled connections, timeouts, retries, per-host rate limits and circuit breakers."""
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Rate limited or a transient server-side failure: worth another attempt
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(requests.RequestException):
+    """Raised instead of sending a request to a host whose circuit is open."""
+
+
+class RateLimiter:
+    """Lets ``burst`` requests through at once, then spaces them ``1 / rate`` seconds apart."""
+
+    def __init__(self, rate, burst=1):
+        self.interval = 1.0 / rate
+        self.burst = max(burst, 1)
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            # Reserve the next free slot; up to ``burst`` slots may lie in the past
+            start = max(self._next, now - (self.burst - 1) * self.interval)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+class CircuitBreaker:
+    """Stops calling a host after ``threshold`` consecutive failures.
+
+    The open circuit rejects requests for ``cooldown`` seconds, then lets a
+    single trial request through; its outcome closes or reopens the circuit.
+    """
+
+    def __init__(self, threshold=5, cooldown=60.0):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self._opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self._opened_at is None:
+            return "closed"
+        if self._trial or time.monotonic() - self._opened_at < self.cooldown:
+            return "open"
+        return "half-open"
+
+    def allow(self):
+        with self._lock:
+            state = self.state
+            if state == "half-open":
+                self._trial = True
+            return state != "open"
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._opened_at = None
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial = False
+            if self.failures >= self.threshold:
+                self._opened_at = time.monotonic()
+
+
+def retry_after_seconds(response):
+    """Seconds the server asked us to wait via Retry-After, or None."""
+    value = response.headers.get("Retry-After") if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max((parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class HttpClient:
+    """Pooled session whose ``get`` never hangs and backs off from failing hosts.
+
+    Each attempt has a ``(connect, read)`` timeout. Request errors (timeouts,
+    refused connections, ...) and RETRY_STATUSES are retried up to
+    ``retries`` times with jittered exponential backoff, or after the
+    server's Retry-After when it sends one (longer than ``max_backoff`` gives
+    up instead). Requests to a host are spaced by its rate limiter, and
+    after ``breaker_threshold`` consecutive failed requests its circuit
+    opens: ``get`` raises CircuitOpenError without touching the network, so
+    callers fall back to cached data at once. ``rate_limit=None`` or
+    ``breaker_threshold=0`` disable those.
+    """
+
+    def __init__(self, pool_size=20, timeout=(5.0, 30.0), retries=3, backoff=0.5, max_backoff=30.0,
+                 rate_limit=None, burst=1, breaker_threshold=5, breaker_cooldown=60.0):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.rate_limit = rate_limit
+        self.burst = burst
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(pool_size, 1))
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _host(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None:
+                state = self._hosts[host] = {
+                    "limiter": RateLimiter(self.rate_limit, self.burst) if self.rate_limit else None,
+                    "breaker": CircuitBreaker(self.breaker_threshold, self.breaker_cooldown)
+                    if self.breaker_threshold > 0 else None,
+                    "requests": 0,
+                    "retries": 0,
+                    "rejected": 0,
+                }
+            return host, state
+
+    def _count(self, state, counter):
+        with self._lock:
+            state[counter] += 1
+
+    def _retry_delay(self, attempt, response):
+        delay = retry_after_seconds(response)
+        if delay is None:
+            return min(self.backoff * 2 ** attempt, self.max_backoff) * random.uniform(0.5, 1.0)
+        return delay if delay <= self.max_backoff else None
+
+    def get(self, url, headers=None):
+        host, state = self._host(url)
+        breaker = state["breaker"]
+        if breaker is not None and not breaker.allow():
+            self._count(state, "rejected")
+            raise CircuitOpenError(f"circuit open for {host}")
+
+        for attempt in range(self.retries + 1):
+            if state["limiter"] is not None:
+                state["limiter"].acquire()
+            self._count(state, "requests")
+            try:
+                response = self.session.get(url, headers=headers, timeout=self.timeout)
+            except requests.RequestException as e:
+                error, response = e, None
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    if breaker is not None:
+                        breaker.record_success()
+                    return response
+            delay = self._retry_delay(attempt, response)
+            # Stop retrying once other requests have opened the circuit
+            if attempt == self.retries or delay is None or (breaker is not None and breaker.state == "open"):
+                break
+            self._count(state, "retries")
+            time.sleep(delay)
+
+        if breaker is not None:
+            breaker.record_failure()
+        if response is None:
+            raise error
+        return response
+
+    def stats(self):
+        """Per-host request, retry and rejection counters and circuit state."""
+        with self._lock:
+            hosts = dict(self._hosts)
+        return {
+            host: {
+                "requests": state["requests"],
+                "retries": state["retries"],
+                "rejected": state["rejected"],
+                "circuit": state["breaker"].state if state["breaker"] is not None else "disabled",
+            }
+            for host, state in hosts.items()
+        }
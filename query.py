@@ -0,0 +1,558 @@
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype
+
+
+def _to_timestamp(value):
+    return None if value is None else pd.Timestamp(value)
+
+
+class FrameIndex:
+    """Answers (protocol, chains, date range) filters on a frame by slicing.
+
+    The frame is kept sorted by (protocol, chain, date), so each
+    (protocol, chain) pair is one contiguous run of rows with ascending
+    dates. A filter is then a dict lookup per chain plus two binary
+    searches on that run's dates, and the result is a set of row slices
+    (views, no copy) instead of boolean masks over the whole history.
+
+    Frames that already come grouped and date-sorted are used as-is, which
+    keeps memory-mapped snapshots shared rather than copied.
+    """
+
+    def __init__(self, df, keys=("protocol", "chain"), date_col="date"):
+        self.keys = list(keys)
+        self.date_col = date_col
+        if not self._is_grouped(df):
+            df = df.sort_values([*self.keys, date_col], kind="stable", ignore_index=True)
+        self.df = df
+        self.dates = df[date_col].to_numpy().view("i8")
+        self.groups = self._group_bounds(df)
+
+    def _key_codes(self, df):
+        return [pd.factorize(df[key], sort=False)[0] for key in self.keys]
+
+    def _is_grouped(self, df):
+        if len(df) < 2:
+            return True
+        codes = self._key_codes(df)
+        new_group = np.zeros(len(df) - 1, dtype=bool)
+        for c in codes:
+            new_group |= c[1:] != c[:-1]
+        # Each key combination must appear in a single run...
+        starts = np.flatnonzero(np.r_[True, new_group])
+        combos = pd.MultiIndex.from_arrays([c[starts] for c in codes])
+        if combos.has_duplicates:
+            return False
+        # ...with non-decreasing dates inside it
+        dates = df[self.date_col].to_numpy().view("i8")
+        return bool(np.all((np.diff(dates) >= 0) | new_group))
+
+    def _group_bounds(self, df):
+        if df.empty:
+            return {}
+        keys = df[self.keys]
+        change = np.zeros(len(df), dtype=bool)
+        change[0] = True
+        for code in self._key_codes(df):
+            change[1:] |= code[1:] != code[:-1]
+        starts = np.flatnonzero(change)
+        stops = np.r_[starts[1:], len(df)]
+        first_rows = keys.iloc[starts].itertuples(index=False, name=None)
+        return {key: (start, stop) for key, start, stop in zip(first_rows, starts, stops)}
+
+    def bounds(self, key, start_date, end_date):
+        """Row range of ``key`` between two timestamps (inclusive), or None if ``key`` has no rows."""
+        bounds = self.groups.get(key)
+        if bounds is None:
+            return None
+        start, stop = bounds
+        dates = self.dates[start:stop]
+        lo = start if start_date is None else start + int(np.searchsorted(dates, start_date.value, "left"))
+        hi = stop if end_date is None else start + int(np.searchsorted(dates, end_date.value, "right"))
+        return lo, hi
+
+    def slices(self, protocol, chains, start_date=None, end_date=None):
+        """Per-chain row slices for ``protocol`` in the date range, as (chain, view) pairs.
+
+        Dates may be strings or timestamps; both ends are inclusive. Chains
+        without rows in the range are left out.
+        """
+        start_date = _to_timestamp(start_date)
+        end_date = _to_timestamp(end_date)
+        result = []
+        for chain in chains or []:
+            bounds = self.bounds((protocol, chain), start_date, end_date)
+            if bounds is not None and bounds[1] > bounds[0]:
+                result.append((chain, self.df.iloc[bounds[0]:bounds[1]]))
+        return result
+
+    def combine(self, slices):
+        """Join the views returned by ``slices()`` into a single frame."""
+        parts = [view for _, view in slices]
+        if not parts:
+            return self.df.iloc[0:0]
+        if len(parts) == 1:
+            return parts[0]
+        return pd.concat(parts)
+
+    def filter(self, protocol, chains, start_date=None, end_date=None):
+        """Rows for ``protocol`` and ``chains`` in the date range as a single frame."""
+        return self.combine(self.slices(protocol, chains, start_date, end_date))
+
+    def latest(self, keys, metrics, end_date=None):
+        """Latest rows at or before ``end_date`` across the groups in ``keys``.
+
+        Returns the latest date any of the groups has (None without rows),
+        the sum of each metric over the rows at that date (NaNs count as
+        zero) and the keys of the groups that have them. Each group costs
+        one binary search on its dates, however long its history is.
+        """
+        end_date = _to_timestamp(end_date)
+        found, bounds = [], []
+        for key in keys:
+            key_bounds = self.bounds(key, None, end_date)
+            if key_bounds is not None and key_bounds[1] > key_bounds[0]:
+                found.append(key)
+                bounds.append(key_bounds)
+        if not found:
+            return None, {metric: 0.0 for metric in metrics}, []
+
+        bounds = np.array(bounds, dtype=np.int64)
+        last_dates = self.dates[bounds[:, 1] - 1]
+        latest = last_dates.max()
+        at_latest = np.flatnonzero(last_dates == latest)
+        # Rows at the latest date: usually just each group's last row
+        positions = np.concatenate([
+            np.arange(lo + int(np.searchsorted(self.dates[lo:hi], latest, "left")), hi)
+            for lo, hi in bounds[at_latest]
+        ])
+        totals = {metric: float(np.nansum(self.df[metric].to_numpy()[positions])) for metric in metrics}
+        return pd.Timestamp(latest), totals, [found[i] for i in at_latest]
+
+
+class RollupCube:
+    """Per (protocol, chain, date) metric totals with running sums along date.
+
+    Built from a FrameIndex. Rows sharing a (protocol, chain, date) are summed
+    once when the cube is built (pool data has one row per pool; protocol
+    data is already at this grain and is used as-is). For every metric the cube also stores a
+    cumulative sum that restarts at each (protocol, chain), so the total of
+    any date range is two binary searches and one subtraction, however long
+    the range is. NaNs count as zero, as in ``groupby().sum()``.
+    """
+
+    def __init__(self, index, metrics=None):
+        df = index.df
+        if metrics is None:
+            metrics = [c for c in df.columns if c != index.date_col and is_numeric_dtype(df[c])]
+        self.metrics = list(metrics)
+
+        starts = np.array([start for start, _ in index.groups.values()], dtype=np.int64)
+        if self._has_duplicate_dates(index, starts):
+            cube = (
+                df.groupby([*index.keys, index.date_col], observed=True, sort=True)[self.metrics]
+                .sum()
+                .reset_index()
+            )
+            index = FrameIndex(cube, index.keys, index.date_col)
+            starts = np.array([start for start, _ in index.groups.values()], dtype=np.int64)
+        self.index = index
+
+        # Group number of every row, for cumulative sums that restart per group
+        group_ids = np.zeros(len(index.df), dtype=np.int64)
+        group_ids[starts[1:]] = 1
+        group_ids = np.cumsum(group_ids)
+        self.cumsums = {
+            metric: pd.Series(index.df[metric].to_numpy(dtype="float64"))
+            .fillna(0.0)
+            .groupby(group_ids)
+            .cumsum()
+            .to_numpy()
+            for metric in self.metrics
+        }
+
+    @staticmethod
+    def _has_duplicate_dates(index, starts):
+        same_date = np.diff(index.dates) == 0
+        # A repeated date across a group boundary is not a duplicate
+        same_date[starts[1:] - 1] = False
+        return bool(same_date.any())
+
+    def range_total(self, protocol, chain, metric, start_date=None, end_date=None):
+        """Sum of ``metric`` for one protocol/chain over a date range (inclusive), or None without rows."""
+        key = (protocol, chain)
+        bounds = self.index.bounds(key, _to_timestamp(start_date), _to_timestamp(end_date))
+        if bounds is None or bounds[1] <= bounds[0]:
+            return None
+        lo, hi = bounds
+        cumsum = self.cumsums[metric]
+        before = cumsum[lo - 1] if lo > self.index.groups[key][0] else 0.0
+        return float(cumsum[hi - 1] - before)
+
+    def totals_by_chain(self, protocol, chains, metric, start_date=None, end_date=None):
+        """(chain, total) pairs for the chains that have rows in the range, ordered by chain."""
+        if metric not in self.cumsums:
+            raise KeyError(metric)
+        totals = []
+        for chain in chains or []:
+            total = self.range_total(protocol, chain, metric, start_date, end_date)
+            if total is not None:
+                totals.append((chain, total))
+        return sorted(totals)
+
+
+# Coarser levels of a TimePyramid and the calendar period of each
+PYRAMID_PERIODS = {"weekly": "W-SUN", "monthly": "M"}
+# Average days per period of each level, to count the periods in a range
+PYRAMID_DAYS = {"daily": 1, "weekly": 7, "monthly": 30.44}
+
+
+class TimePyramid:
+    """Daily, weekly and monthly rows per (protocol, chain) for the time series.
+
+    The daily level is the RollupCube's (protocol, chain, date) rows; the
+    weekly and monthly levels are aggregated from them once, dated by the
+    first day of each calendar period. Metrics in ``last`` (stocks such as
+    TVL) keep the period's last value, all others (flows such as fees) are
+    summed, with NaNs skipped as in ``groupby()``.
+
+    A query uses the stored periods that lie wholly inside the date range
+    and aggregates the partial periods at its two ends from the daily rows,
+    so every level answers any range exactly.
+    """
+
+    def __init__(self, rollup, last=("tvl",)):
+        daily = rollup.index
+        self.keys = daily.keys
+        self.date_col = daily.date_col
+        self.aggregations = {metric: "last" if metric in last else "sum" for metric in rollup.metrics}
+        self.levels = {"daily": daily}
+        for level, period in PYRAMID_PERIODS.items():
+            self.levels[level] = FrameIndex(self._aggregate(daily.df, period), self.keys, self.date_col)
+        self.values = {
+            level: {metric: index.df[metric].to_numpy() for metric in self.aggregations}
+            for level, index in self.levels.items()
+        }
+        if len(daily.dates):
+            self.first_date = pd.Timestamp(daily.dates.min())
+            self.last_date = pd.Timestamp(daily.dates.max())
+        else:
+            self.first_date = self.last_date = None
+
+    def _aggregate(self, df, period):
+        starts = df[self.date_col].dt.to_period(period).dt.start_time.rename(self.date_col)
+        grouped = df.groupby([*(df[key] for key in self.keys), starts], observed=True, sort=True)
+        return grouped.agg(self.aggregations).reset_index()
+
+    def level_for(self, start_date, end_date, max_periods):
+        """The finest level with at most ``max_periods`` periods between the two dates."""
+        start = self.first_date if start_date is None else _to_timestamp(start_date)
+        end = self.last_date if end_date is None else _to_timestamp(end_date)
+        if start is None or end is None:
+            return "daily"
+        days = (end - start).days + 1
+        for level, period_days in PYRAMID_DAYS.items():
+            if days / period_days <= max_periods:
+                return level
+        return "monthly"
+
+    def _inner_periods(self, period, start_date, end_date):
+        """First and last period start of the periods wholly inside the range (None: unbounded)."""
+        first = last = None
+        if start_date is not None:
+            p = start_date.to_period(period)
+            first = p.start_time if p.start_time == start_date else (p + 1).start_time
+        if end_date is not None:
+            p = end_date.to_period(period)
+            last = p.start_time if p.end_time.normalize() <= end_date else (p - 1).start_time
+        return first, last
+
+    def _edge(self, key, start_date, end_date):
+        """Metric values of one partial period aggregated from its daily rows, or None without rows."""
+        daily = self.levels["daily"]
+        bounds = daily.bounds(key, start_date, end_date)
+        if bounds is None or bounds[1] <= bounds[0]:
+            return None
+        values = {}
+        for metric, how in self.aggregations.items():
+            column = self.values["daily"][metric][bounds[0]:bounds[1]]
+            if how == "sum":
+                values[metric] = np.nansum(column)
+            else:
+                valid = column[~np.isnan(column)]
+                values[metric] = valid[-1] if len(valid) else np.nan
+        return values
+
+    def filter(self, level, protocol, chains, start_date=None, end_date=None):
+        """Rows at ``level`` for ``protocol`` and ``chains`` in the date range, dated by period.
+
+        Dates may be strings or timestamps; both ends are inclusive. A
+        period cut by the range start is dated by the range start.
+        """
+        if level == "daily":
+            return self.levels["daily"].filter(protocol, chains, start_date, end_date)
+        start_date = _to_timestamp(start_date)
+        end_date = _to_timestamp(end_date)
+        period = PYRAMID_PERIODS[level]
+        first, last = self._inner_periods(period, start_date, end_date)
+        # Daily ranges of the partial periods before and after the whole ones, with their dates
+        head = tail = None
+        if first is not None:
+            head_end = first - pd.Timedelta(1)
+            head = (start_date, head_end if end_date is None else min(head_end, end_date))
+        if last is not None:
+            tail_start = last.to_period(period).end_time.normalize() + pd.Timedelta(days=1)
+            if first is not None:
+                tail_start = max(tail_start, first)
+            tail = (tail_start, end_date)
+        whole = first is None or last is None or first <= last
+
+        index = self.levels[level]
+        values = self.values[level]
+        row_chains, dates, columns = [], [], {metric: [] for metric in self.aggregations}
+        for chain in chains or []:
+            key = (protocol, chain)
+            parts = []
+            if head is not None:
+                parts.append((head[0].value, self._edge(key, *head)))
+            if whole:
+                bounds = index.bounds(key, first, last)
+                if bounds is not None and bounds[1] > bounds[0]:
+                    lo, hi = bounds
+                    parts.append((index.dates[lo:hi], {metric: values[metric][lo:hi] for metric in columns}))
+            if tail is not None:
+                parts.append((tail[0].value, self._edge(key, *tail)))
+            for part_dates, part in parts:
+                if part is None:
+                    continue
+                part_dates = np.atleast_1d(part_dates)
+                row_chains.append(np.repeat(chain, len(part_dates)))
+                dates.append(part_dates)
+                for metric in columns:
+                    columns[metric].append(np.atleast_1d(part[metric]))
+
+        if not dates:
+            return index.df.iloc[0:0]
+        frame = {
+            self.keys[0]: protocol,
+            self.keys[1]: np.concatenate(row_chains),
+            self.date_col: np.concatenate(dates).astype("datetime64[ns]"),
+        }
+        for metric, parts in columns.items():
+            frame[metric] = np.concatenate(parts).astype(values[metric].dtype)
+        return pd.DataFrame(frame)
+
+
+# DataTable filter operators, longest first so ">=" wins over ">"
+FILTER_OPERATORS = [
+    ("datestartswith", "datestartswith"), ("contains", "contains"),
+    (">=", "ge"), ("<=", "le"), ("!=", "ne"), (">", "gt"), ("<", "lt"), ("=", "eq"),
+    ("ge", "ge"), ("le", "le"), ("ne", "ne"), ("gt", "gt"), ("lt", "lt"), ("eq", "eq"),
+    ("s>", "gt"), ("s<", "lt"),
+]
+
+
+def parse_filter_query(filter_query):
+    """Split a DataTable ``filter_query`` into (column, operator, value) terms.
+
+    Supports the terms the table's filter row produces, joined with ``&&``,
+    e.g. ``{amount_usd} >= 1000 && {action} contains Swap``. Terms that
+    cannot be parsed are ignored.
+    """
+    terms = []
+    for part in (filter_query or "").split(" && "):
+        part = part.strip()
+        if not part.startswith("{") or "}" not in part:
+            continue
+        column, rest = part[1:].split("}", 1)
+        rest = rest.strip()
+        for token, operator in FILTER_OPERATORS:
+            if rest.startswith(token):
+                value = rest[len(token):].strip()
+                if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'`":
+                    value = value[1:-1]
+                terms.append((column, operator, value))
+                break
+    return terms
+
+
+def _date_prefix_bounds(prefix, first, last):
+    """[low, high) seconds in [first, last] whose displayed "YYYY-MM-DD HH:MM:SS" starts with ``prefix``.
+
+    The displayed strings sort like the times they show, so the matching
+    times are one contiguous range; each bound is a binary search over
+    seconds that formats one time per step. ``2026-10-1`` therefore matches
+    October 10th to 19th, not only October 1st.
+    """
+    def shown(second):
+        return str(np.datetime64(int(second), "s")).replace("T", " ")[:len(prefix)]
+
+    def first_second(predicate):
+        low, high = int(first.astype(np.int64)), int(last.astype(np.int64)) + 1
+        while low < high:
+            middle = (low + high) // 2
+            if predicate(shown(middle)):
+                high = middle
+            else:
+                low = middle + 1
+        return np.datetime64(low, "s")
+
+    return first_second(lambda text: text >= prefix), first_second(lambda text: text > prefix)
+
+
+def _decode_bytes_columns(df):
+    """``df`` with fixed-width bytes columns (from a snapshot) decoded to strings."""
+    columns = {
+        name: np.char.decode(df[name].to_numpy(), "utf-8").astype(object)
+        for name in df.columns if df[name].dtype.kind == "S"
+    }
+    return df.assign(**columns) if columns else df
+
+
+class TransactionIndex:
+    """Serves one page of a large transaction frame without touching the rest.
+
+    The frame is grouped by (protocol, chain) with ascending timestamps inside
+    each group, like FrameIndex. A page sorted by timestamp (or any other
+    column, whose per-group order is computed once and cached) only needs
+    the first ``offset + page_size`` rows of each selected group, merged;
+    the row count of a selection is the sum of its group sizes. A filter
+    query adds one vectorized pass over the selected groups' rows.
+    """
+
+    def __init__(self, df, keys=("protocol", "chain"), time_col="timestamp"):
+        self.time_col = time_col
+        self.frame_index = FrameIndex(df, keys, time_col)
+        self.df = self.frame_index.df
+        self.groups = self.frame_index.groups
+        self._orders = {}
+
+    def _selected_groups(self, protocol, chains):
+        return [
+            bounds for (group_protocol, group_chain), bounds in self.groups.items()
+            if (protocol is None or group_protocol == protocol) and (chains is None or group_chain in chains)
+        ]
+
+    def _sort_values(self, column, positions):
+        """Values of ``column`` at ``positions`` as a natively sortable array."""
+        series = self.df[column]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # Rank categories alphabetically rather than by code
+            ranks = np.argsort(np.argsort(series.cat.categories.to_numpy()))
+            return ranks[series.cat.codes.to_numpy()[positions]]
+        values = series.to_numpy()[positions]
+        return values.view("i8") if values.dtype.kind == "M" else values
+
+    def _group_order(self, column, bounds):
+        """Row positions of one group sorted by ``column``, ascending."""
+        start, stop = bounds
+        if column == self.time_col:
+            return np.arange(start, stop)
+        key = (column, start)
+        if key not in self._orders:
+            values = self._sort_values(column, np.arange(start, stop))
+            self._orders[key] = start + np.argsort(values, kind="stable")
+        return self._orders[key]
+
+    def _filter_mask(self, positions, terms):
+        mask = np.ones(len(positions), dtype=bool)
+        for column, operator, value in terms:
+            if column not in self.df.columns:
+                continue
+            series = self.df[column]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                categories = series.cat.categories.astype(str)
+                if operator == "contains":
+                    matching = categories.str.contains(value, case=False, regex=False)
+                elif operator == "eq":
+                    matching = categories == value
+                elif operator == "ne":
+                    matching = categories != value
+                else:
+                    continue
+                mask &= np.isin(series.cat.codes.to_numpy()[positions], np.flatnonzero(matching))
+                continue
+
+            values = series.to_numpy()[positions]
+            if values.dtype.kind == "M":
+                if operator == "datestartswith":
+                    seconds = values.astype("datetime64[s]")
+                    if len(seconds):
+                        low, high = _date_prefix_bounds(value, seconds.min(), seconds.max())
+                        mask &= (seconds >= low) & (seconds < high)
+                    continue
+                try:
+                    value = pd.Timestamp(value).to_datetime64()
+                except ValueError:
+                    continue
+            elif values.dtype.kind == "f":
+                try:
+                    value = float(value)
+                except ValueError:
+                    continue
+            elif values.dtype.kind == "S":
+                # Fixed-width bytes columns from a snapshot
+                value = value.encode("utf-8")
+                if operator == "contains":
+                    mask &= np.char.find(np.char.lower(values), value.lower()) >= 0
+                    continue
+            elif operator == "contains":
+                mask &= pd.Series(values).str.contains(value, case=False, regex=False).to_numpy()
+                continue
+            if operator == "eq":
+                mask &= values == value
+            elif operator == "ne":
+                mask &= values != value
+            elif operator == "gt":
+                mask &= values > value
+            elif operator == "ge":
+                mask &= values >= value
+            elif operator == "lt":
+                mask &= values < value
+            elif operator == "le":
+                mask &= values <= value
+        return mask
+
+    def page(self, protocol=None, chains=None, sort_by=None, filter_query="", page=0, page_size=10,
+             extra_terms=()):
+        """One page of rows plus the total row count of the selection.
+
+        ``protocol``/``chains`` of None select everything. ``sort_by`` is a
+        DataTable ``sort_by`` list (first entry used); newest first by default.
+        ``extra_terms`` are (column, operator, value) terms ANDed with the
+        filter query, with values already of the column's type.
+        """
+        if sort_by:
+            column, descending = sort_by[0]["column_id"], sort_by[0]["direction"] == "desc"
+        else:
+            column, descending = self.time_col, True
+        groups = self._selected_groups(protocol, chains)
+        offset, needed = page * page_size, (page + 1) * page_size
+        terms = parse_filter_query(filter_query) + list(extra_terms)
+
+        if terms:
+            positions = np.concatenate([np.arange(start, stop) for start, stop in groups] or [np.arange(0)])
+            positions = positions[self._filter_mask(positions, terms)]
+            total = len(positions)
+            values = self._sort_values(column, positions)
+            if needed < total and (not descending or values.dtype.kind in "if"):
+                # Only the rows up to the end of this page need to be in order
+                keys = -values if descending else values
+                candidates = np.argpartition(keys, needed - 1)[:needed]
+                positions, values = positions[candidates], values[candidates]
+        else:
+            total = sum(stop - start for start, stop in groups)
+            parts = []
+            for bounds in groups:
+                order = self._group_order(column, bounds)
+                parts.append(order[-needed:] if descending else order[:needed])
+            positions = np.concatenate(parts or [np.arange(0)])
+            values = self._sort_values(column, positions)
+
+        order = np.argsort(values, kind="stable")
+        if descending:
+            order = order[::-1]
+        rows = self.df.iloc[positions[order[offset:needed]]]
+        return _decode_bytes_columns(rows), total
+
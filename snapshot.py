@@ -0,0 +1,117 @@
+"""Versioned, memory-mapped snapshots of DataFrames on local disk.
+
+A snapshot directory looks like::
+
+    CURRENT                 # text file holding the live version number
+    v7/protocol_data/schema.json
+    v7/protocol_data/tvl.npy
+    v7/protocol_data/chain.codes.npy
+    v7/protocol_data/chain.categories.npy
+    ...
+
+Every column is a plain ``.npy`` file. Loading maps them read-only with
+``np.load(mmap_mode="r")`` and wraps them in a DataFrame without copying,
+so every process reading the same version shares one copy in the page
+cache. Low-cardinality string columns are stored as categorical codes
+plus their categories, which are the only part each process materializes.
+Columns of mostly distinct strings (addresses, hashes) would make those
+categories as large as the column, so they are stored as fixed-width
+UTF-8 bytes (numpy ``S`` dtype) and mapped like any other array; readers
+see ``bytes`` values in them.
+"""
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+CURRENT_FILE = "CURRENT"
+
+# Published versions kept on disk; older ones are deleted on publish
+KEEP_VERSIONS = 2
+
+# String columns with more distinct values than this fraction of their rows
+# are stored as fixed-width bytes instead of categorical codes
+BYTES_MIN_UNIQUE_RATIO = 0.5
+
+
+def current_version(directory):
+    try:
+        with open(os.path.join(directory, CURRENT_FILE)) as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
+
+def _version_dir(directory, version):
+    return os.path.join(directory, f"v{version}")
+
+
+def _write_frame(path, df):
+    os.makedirs(path)
+    columns = []
+    for name in df.columns:
+        series = df[name]
+        if series.dtype == object and series.nunique() > BYTES_MIN_UNIQUE_RATIO * len(series):
+            np.save(os.path.join(path, f"{name}.npy"), series.str.encode("utf-8").to_numpy().astype("S"))
+            columns.append({"name": name, "kind": "bytes"})
+            continue
+        if series.dtype == object:
+            series = series.astype("category")
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            np.save(os.path.join(path, f"{name}.codes.npy"), series.cat.codes.to_numpy())
+            np.save(os.path.join(path, f"{name}.categories.npy"), series.cat.categories.to_numpy().astype(str))
+            columns.append({"name": name, "kind": "categorical"})
+        else:
+            np.save(os.path.join(path, f"{name}.npy"), series.to_numpy())
+            columns.append({"name": name, "kind": "array"})
+    with open(os.path.join(path, "schema.json"), "w") as f:
+        json.dump({"columns": columns, "rows": len(df)}, f)
+
+
+def _read_frame(path):
+    with open(os.path.join(path, "schema.json")) as f:
+        schema = json.load(f)
+    columns = {}
+    for column in schema["columns"]:
+        name = column["name"]
+        if column["kind"] == "categorical":
+            codes = np.load(os.path.join(path, f"{name}.codes.npy"), mmap_mode="r")
+            categories = np.load(os.path.join(path, f"{name}.categories.npy"))
+            columns[name] = pd.Categorical.from_codes(codes, categories=categories, validate=False)
+        else:
+            columns[name] = np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+    return pd.DataFrame(columns, index=pd.RangeIndex(schema["rows"]), copy=False)
+
+
+def publish_frames(directory, frames):
+    """Write ``frames`` (name -> DataFrame) as a new version and make it current.
+
+    The version directory is fully written under a temporary name before it
+    is renamed into place and ``CURRENT`` is atomically replaced, so readers
+    only ever see complete snapshots. Returns the new version number.
+    """
+    os.makedirs(directory, exist_ok=True)
+    version = (current_version(directory) or 0) + 1
+    tmp_dir = os.path.join(directory, f".v{version}.{os.getpid()}.tmp")
+    for name, df in frames.items():
+        _write_frame(os.path.join(tmp_dir, name), df)
+    os.rename(tmp_dir, _version_dir(directory, version))
+
+    tmp_current = os.path.join(directory, f".{CURRENT_FILE}.{os.getpid()}.tmp")
+    with open(tmp_current, "w") as f:
+        f.write(str(version))
+    os.replace(tmp_current, os.path.join(directory, CURRENT_FILE))
+
+    # Readers that still map an old version keep working after the unlink
+    for entry in os.listdir(directory):
+        if entry.startswith("v") and entry[1:].isdigit() and int(entry[1:]) <= version - KEEP_VERSIONS:
+            shutil.rmtree(os.path.join(directory, entry), ignore_errors=True)
+    return version
+
+
+def load_frames(directory, version, names):
+    """Map the frames ``names`` of snapshot ``version`` read-only."""
+    base = _version_dir(directory, version)
+    return {name: _read_frame(os.path.join(base, name)) for name in names}
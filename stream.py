@@ -0,0 +1,255 @@
+"""Live transaction feed: a pluggable source polled into a fixed-size ring buffer."""
+import threading
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from data import generate_transaction_data
+from query import TransactionIndex
+
+
+# Low-cardinality columns the ring buffer stores as integer codes
+LABEL_COLUMNS = ("protocol", "chain", "action")
+
+
+def _code_dtype(n_categories):
+    """Smallest signed integer dtype holding codes 0..n_categories-1 and -1 for missing."""
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_categories <= np.iinfo(dtype).max + 1:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+class TransactionRingBuffer:
+    """Fixed-capacity, columnar ring buffer of the most recent transactions.
+
+    Every column lives in one preallocated numpy array of ``capacity`` rows,
+    so memory stays constant no matter how many rows are appended; the
+    oldest rows are overwritten. ``total`` counts every row ever appended
+    and doubles as a cursor: ``since(cursor)`` returns only the rows
+    appended after it.
+
+    The ``labels`` columns are stored as integer codes into categories that
+    grow as new values arrive, with the code dtype widened to fit. Numeric
+    and datetime columns keep their dtype; any other column (addresses,
+    hashes) is stored as an object array of strings, whatever the dtype of
+    the ``template`` frame.
+    """
+
+    def __init__(self, capacity, template, labels=LABEL_COLUMNS):
+        self.capacity = capacity
+        self.columns = list(template.columns)
+        self.total = 0
+        self._arrays = {}
+        self._categories = {}
+        for name in self.columns:
+            dtype = template[name].dtype
+            if name in labels:
+                categories = dtype.categories if isinstance(dtype, pd.CategoricalDtype) else pd.Index([], dtype=object)
+                self._categories[name] = categories
+                self._arrays[name] = np.full(capacity, -1, dtype=_code_dtype(len(categories)))
+            elif dtype.kind in "biufmM":
+                self._arrays[name] = np.empty(capacity, dtype=dtype)
+            else:
+                self._arrays[name] = np.empty(capacity, dtype=object)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    def _label_codes(self, df, name):
+        values = df[name]
+        categories = self._categories[name]
+        new = pd.Index(values.dropna().unique(), dtype=object).difference(categories)
+        if len(new):
+            # Appending keeps the codes already in the buffer valid
+            categories = self._categories[name] = categories.append(new)
+            dtype = _code_dtype(len(categories))
+            if dtype != self._arrays[name].dtype:
+                self._arrays[name] = self._arrays[name].astype(dtype)
+        return pd.Categorical(values, categories=categories).codes
+
+    def _column_values(self, df, name):
+        if name in self._categories:
+            return self._label_codes(df, name)
+        values = df[name].to_numpy()
+        if values.dtype.kind == "S":
+            # Bytes columns of a mapped snapshot
+            return np.char.decode(values, "utf-8").astype(object)
+        return values
+
+    def append(self, df):
+        """Append the rows of ``df``, overwriting the oldest rows once full."""
+        if df.empty:
+            return
+        with self._lock:
+            # Rows that would be overwritten within this same append are skipped
+            skipped = max(len(df) - self.capacity, 0)
+            df = df.iloc[skipped:]
+            n = len(df)
+            self.total += skipped
+            start = self.total % self.capacity
+            first = min(n, self.capacity - start)
+            for name in self.columns:
+                values = self._column_values(df, name)
+                array = self._arrays[name]
+                array[start:start + first] = values[:first]
+                array[:n - first] = values[first:]
+            self.total += n
+
+    def _frame(self, first_seq, last_seq):
+        positions = np.arange(first_seq, last_seq) % self.capacity
+        columns = {}
+        for name in self.columns:
+            values = self._arrays[name][positions]
+            if name in self._categories:
+                values = pd.Categorical.from_codes(values, categories=self._categories[name])
+            columns[name] = values
+        return pd.DataFrame(columns, index=pd.RangeIndex(first_seq, last_seq))
+
+    def since(self, cursor):
+        """Rows appended after ``cursor`` that are still buffered, oldest first, plus the new cursor."""
+        with self._lock:
+            first = max(cursor, self.total - self.capacity, 0)
+            return self._frame(first, self.total), self.total
+
+    def tail(self, n=None):
+        """The last ``n`` buffered rows (all of them by default), oldest first."""
+        with self._lock:
+            n = len(self) if n is None else min(n, len(self))
+            return self._frame(self.total - n, self.total)
+
+
+def _concat_frames(frames):
+    """Stack frames row-wise, merging the categories of categorical columns."""
+    columns = {}
+    for name in frames[0].columns:
+        if isinstance(frames[0][name].dtype, pd.CategoricalDtype):
+            columns[name] = union_categoricals([df[name] for df in frames])
+        else:
+            columns[name] = np.concatenate([df[name].to_numpy() for df in frames])
+    return pd.DataFrame(columns)
+
+
+class LiveTransactionIndex:
+    """TransactionIndex-like pages over a TransactionRingBuffer, updated incrementally.
+
+    Rows are indexed in segments of consecutive appends, each its own
+    TransactionIndex. ``refresh()`` indexes only the rows appended since the
+    last call and merges the newest segments while the older one is no
+    larger, up to ``segment_rows`` rows, so each row is re-sorted a
+    logarithmic number of times rather than the whole buffer on every
+    append. Segments whose rows have all been overwritten are dropped; the
+    overwritten rows of the oldest remaining one are filtered out by their
+    sequence number. ``page()`` merges the first rows of each segment.
+    """
+
+    SEQUENCE = "_sequence"
+
+    def __init__(self, buffer, segment_rows=None):
+        self.buffer = buffer
+        self.segment_rows = segment_rows or max(buffer.capacity // 8, 1)
+        self._segments = []  # (first sequence, last sequence + 1, TransactionIndex)
+        self._total = 0
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """Index the rows appended since the previous refresh."""
+        with self._lock:
+            rows, total = self.buffer.since(self._total)
+            if total == self._total:
+                return
+            self._total = total
+            oldest = max(total - self.buffer.capacity, 0)
+            self._segments = [segment for segment in self._segments if segment[1] > oldest]
+            rows = rows.assign(**{self.SEQUENCE: rows.index.to_numpy()})
+            for start in range(0, len(rows), self.segment_rows):
+                chunk = rows.iloc[start:start + self.segment_rows]
+                first = int(chunk[self.SEQUENCE].iloc[0])
+                self._segments.append((first, first + len(chunk), TransactionIndex(chunk)))
+                self._merge_newest()
+
+    def _merge_newest(self):
+        while len(self._segments) >= 2:
+            (first, middle, older), (_, last, newer) = self._segments[-2:]
+            if middle - first > last - middle or last - first > self.segment_rows:
+                return
+            self._segments[-2:] = [(first, last, TransactionIndex(_concat_frames([older.df, newer.df])))]
+
+    def page(self, protocol=None, chains=None, sort_by=None, filter_query="", page=0, page_size=10):
+        """Same as ``TransactionIndex.page``, over the rows currently in the buffer."""
+        self.refresh()
+        with self._lock:
+            segments, oldest = list(self._segments), max(self._total - self.buffer.capacity, 0)
+        if not segments:
+            return self.buffer.tail(0), 0
+
+        # The first rows of the page range in each segment are enough to merge
+        needed = (page + 1) * page_size
+        pages, total = [], 0
+        for first, _, index in segments:
+            overwritten = [(self.SEQUENCE, "ge", oldest)] if first < oldest else []
+            rows, count = index.page(protocol, chains, sort_by, filter_query, 0, needed, overwritten)
+            pages.append(rows)
+            total += count
+
+        if sort_by:
+            column, descending = sort_by[0]["column_id"], sort_by[0]["direction"] == "desc"
+        else:
+            column, descending = segments[0][2].time_col, True
+        rows = pd.concat(pages, ignore_index=True)
+        if column in rows.columns:
+            # Categories rank alphabetically, as in TransactionIndex
+            rows = rows.sort_values(
+                column, ascending=not descending, kind="stable",
+                key=lambda values: values.astype(object) if isinstance(values.dtype, pd.CategoricalDtype) else values,
+            )
+        return rows.iloc[page * page_size:needed].drop(columns=self.SEQUENCE), total
+
+
+class StubTransactionSource:
+    """Local stand-in for a live transaction stream.
+
+    Each ``poll()`` returns the synthetic transactions that "arrived" since
+    the previous poll, about ``rate`` per second, timestamped within that
+    interval. A real source only needs the same ``poll()`` method returning
+    a DataFrame with the transaction columns.
+    """
+
+    def __init__(self, rate=5.0, seed=None):
+        self.rate = rate
+        self._rng = np.random.default_rng(seed)
+        self._last_poll = pd.Timestamp.now()
+
+    def poll(self):
+        now = pd.Timestamp.now()
+        elapsed = (now - self._last_poll).total_seconds()
+        self._last_poll = now
+        n = int(self._rng.poisson(self.rate * max(elapsed, 0.0)))
+        # default_rng() passes an existing Generator through, so draws continue this source's stream
+        df = generate_transaction_data(n, seed=self._rng)
+        offsets = np.sort(self._rng.uniform(0, elapsed, n))
+        df["timestamp"] = (now - pd.Timedelta(seconds=elapsed)) + pd.to_timedelta(offsets, unit="s")
+        return df
+
+
+class TransactionFeed(threading.Thread):
+    """Daemon thread that polls ``source`` every ``interval`` seconds into ``buffer``."""
+
+    def __init__(self, source, buffer, interval=1.0):
+        super().__init__(name="transaction-feed", daemon=True)
+        self.source = source
+        self.buffer = buffer
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.buffer.append(self.source.poll())
+            except Exception as e:
+                print(f"Transaction feed poll failed: {e}")
+
+    def stop(self):
+        self._stop_event.set()